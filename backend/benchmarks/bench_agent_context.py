@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import random
+import uuid
+
+from components.config import Config
+from components.rag_graph import RAGGraph
+from components.reranking import build_reranker
+from benchmarks.bench_rerank import build_service, prompt_tokens_total
+from benchmarks.fakes import make_corpus
+
+
+class InlineContextGraph(RAGGraph):
+    """The agent loop before chunks were stored by id, for comparison.
+
+    Every observation carries the full text of its chunks and the prompt
+    re-sends all of them, so a chunk found again at step 3 is in the prompt
+    twice.
+    """
+
+    def _prompt_messages(self, messages: list, chunks: dict) -> list:
+        return messages
+
+    async def _tool_executor(self, state):
+        update = await super()._tool_executor(state)
+        for m in update["messages"]:
+            sections = m.additional_kwargs.pop("observation", None)
+            if sections is not None:
+                m.content = self._render_observation(sections, update["chunks"], expand=set(update["chunks"]))
+        return update
+
+
+def state_bytes(serde, values: dict, inline: bool) -> int:
+    if inline:
+        # That loop kept a growing source list and a running copy of every observation's text
+        # in the state rather than the chunk index.
+        values = dict(values)
+        values["sources"] = values.get("sources") or list((values.pop("chunks", None) or {}).values())
+        values.pop("chunks", None)
+        values["context"] = "\n".join(m.content for m in values.get("messages", [])
+                                      if m.content.startswith("OBSERVATION:"))
+    return len(serde.dumps_typed(values)[1])
+
+
+async def run(graph: RAGGraph, cases, inline: bool) -> dict:
+    serde = graph.graph.checkpointer.serde
+    tokens, steps, final_kb, history_kb, correct = [], [], [], [], 0
+    for query, codes in cases:
+        thread = str(uuid.uuid4())
+        config = {"configurable": {"thread_id": thread}}
+        before = prompt_tokens_total()
+        final = await graph.arun(query, [], thread_id=thread)
+        tokens.append(prompt_tokens_total() - before)
+        steps.append(final.get("steps", 0))
+        correct += all(c in (final.get("response") or "") for c in codes)
+
+        final_kb.append(state_bytes(serde, (await graph.graph.aget_state(config)).values, inline) / 1024)
+        # What a store writing a full snapshot per step would keep for this request.
+        history_kb.append(sum([state_bytes(serde, snapshot.values, inline) / 1024
+                               async for snapshot in graph.graph.aget_state_history(config)]))
+    n = len(cases)
+    return {
+        "mean_agent_steps": round(sum(steps) / n, 3),
+        "mean_prompt_tokens": round(sum(tokens) / n, 1),
+        "p95_prompt_tokens": round(sorted(tokens)[min(n - 1, int(0.95 * n))], 1),
+        "mean_final_state_kb": round(sum(final_kb) / n, 2),
+        "mean_checkpoint_history_kb": round(sum(history_kb) / n, 2),
+        "answer_accuracy": round(correct / n, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt tokens and graph state size per request, "
+                                                 "chunks inline in every observation vs stored once by id.")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--chunks-per-doc", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--max-parts", type=int, default=3, help="Error codes asked about per question.")
+    parser.add_argument("--filler", type=int, default=8, help="Filler sentences per chunk (~100 chars each).")
+    parser.add_argument("--hallucinate-every", type=int, default=4,
+                        help="Every Nth answer is ungrounded, so the run retries with the context it has.")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.chunks_per_doc, filler_sentences=args.filler)
+    rng = random.Random(0)
+    cases = []
+    for i in range(args.queries):
+        parts = rng.sample(corpus, 1 + i % args.max_parts)
+        codes = [d.page_content.split("error code ")[1].split()[0] for d in parts]
+        cases.append((f"What do error codes {' and '.join(codes)} mean?", codes))
+
+    # The top-5 interleave, so each search returns several chunks that can overlap across steps.
+    # Vector-only retrieval misses exact codes more often, which means more steps and more repeats.
+    service = build_service(corpus)
+    service.llm.hallucinate_every = args.hallucinate_every
+    embeddings = service.vector_store_manager.vector_store.embeddings
+    report = {"benchmark": "agent_context", "queries": len(cases), "max_parts": args.max_parts,
+              "agent_context_token_budget": Config.AGENT_CONTEXT_TOKEN_BUDGET}
+    for retrieval, index in (("hybrid", service.lexical_index), ("vector_only", None)):
+        report[retrieval] = {}
+        for label, cls in (("inline_observations", InlineContextGraph), ("chunk_index", RAGGraph)):
+            graph = cls(service.llm, service.vector_store_manager.vector_store, lexical_index=index,
+                        catalog=service.manifest, reranker=build_reranker(embeddings, "none"))
+            service.llm.answers = 0
+            report[retrieval][label] = asyncio.run(run(graph, cases, inline=cls is InlineContextGraph))
+        before, after = report[retrieval]["inline_observations"], report[retrieval]["chunk_index"]
+        report[retrieval]["prompt_token_reduction"] = round(
+            1 - after["mean_prompt_tokens"] / before["mean_prompt_tokens"], 3)
+        report[retrieval]["final_state_reduction"] = round(
+            1 - after["mean_final_state_kb"] / before["mean_final_state_kb"], 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
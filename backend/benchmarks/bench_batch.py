@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from components.config import Config
+from components.embedding_cache import CachedEmbeddings
+from components.metrics import METRICS
+from rag_engine import RAGService
+from benchmarks.fakes import FakeReActLLM, FakeVectorStoreManager, HashingEmbeddings, make_corpus
+
+
+def searches_run() -> int:
+    with METRICS.retrieval_hits._lock:
+        return sum(count for _, _, count in METRICS.retrieval_hits._values.values())
+
+
+def build_service(corpus, latency: float, embed_latency: float):
+    Config.ANSWER_CACHE_ENABLED = False
+    Config.MANIFEST_PATH = None
+    Config.LEXICAL_INDEX_PATH = None
+    # A remote embedding API: every call pays a round trip, however many texts it carries.
+    model = HashingEmbeddings(latency=embed_latency)
+    service = RAGService(
+        vector_store_manager=FakeVectorStoreManager(CachedEmbeddings(model)),
+        llm=FakeReActLLM(latency=latency, verify_codes=True)
+    )
+    for source in sorted({d.metadata["source"] for d in corpus}):
+        update = service.doc_processor.begin_source(source)
+        service.doc_processor.add_chunks([d for d in corpus if d.metadata["source"] == source], update)
+        service.doc_processor.finish_source(update)
+    return service, model
+
+
+def make_eval_set(corpus, n: int, repeat_share: float):
+    # Evaluation sets re-ask the same facts in several questions; ~repeat_share of them repeat one.
+    rng = random.Random(0)
+    codes = [d.page_content.split("error code ")[1].split()[0] for d in corpus]
+    cases = []
+    for i in range(n):
+        if cases and rng.random() < repeat_share:
+            cases.append(rng.choice(cases))
+            continue
+        parts = rng.sample(codes, 1 + i % 2)
+        cases.append((f"What do error codes {' and '.join(parts)} mean?" if len(parts) > 1
+                      else f"What does error code {parts[0]} mean?", parts))
+    return cases
+
+
+async def run(mode: str, service, model, cases, concurrency: int) -> dict:
+    calls_before, searches_before = model.calls, searches_run()
+    reused_before = sum(METRICS.retrieval_reuse._values.values())
+    queries = [q for q, _ in cases]
+    start = time.perf_counter()
+    if mode == "sequential":
+        results = [await service.aquery(q) for q in queries]
+    elif mode == "gather":
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(q):
+            async with semaphore:
+                return await service.aquery(q)
+        results = await asyncio.gather(*(one(q) for q in queries))
+    else:
+        results = [None] * len(queries)
+        async for result in service.aquery_batch(queries, concurrency=concurrency):
+            results[result["index"]] = result
+    elapsed = time.perf_counter() - start
+    correct = sum(all(c in (r.get("response") or "") for c in codes) for r, (_, codes) in zip(results, cases))
+    return {
+        "wall_s": round(elapsed, 3),
+        "questions_per_s": round(len(cases) / elapsed, 2),
+        "embedding_calls": model.calls - calls_before,
+        "searches_run": searches_run() - searches_before,
+        "searches_reused": int(sum(METRICS.retrieval_reuse._values.values()) - reused_before),
+        "answer_accuracy": round(correct / len(cases), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wall time of a question batch: sequential vs gather vs query_batch.")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--repeat-share", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call in seconds.")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Fake embedding round trip in seconds.")
+    args = parser.parse_args()
+
+    corpus = make_corpus(5, 40, filler_sentences=4)
+    cases = make_eval_set(corpus, args.questions, args.repeat_share)
+    Config.BATCH_MAX_CONCURRENCY = max(Config.BATCH_MAX_CONCURRENCY, args.concurrency)
+
+    report = {"benchmark": "batch", "questions": len(cases), "concurrency": args.concurrency,
+              "llm_latency_s": args.latency, "embed_latency_s": args.embed_latency}
+    for mode in ("sequential", "gather", "query_batch"):
+        # A fresh service per mode so no run starts with another's cached query embeddings.
+        service, model = build_service(corpus, args.latency, args.embed_latency)
+        report[mode] = asyncio.run(run(mode, service, model, cases, args.concurrency))
+    report["speedup_vs_sequential"] = round(report["sequential"]["wall_s"] / report["query_batch"]["wall_s"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import json
+import time
+
+from components.config import Config
+from rag_engine import RAGService
+from benchmarks.fakes import FakeReActLLM, FakeVectorStoreManager, make_corpus, make_queries
+
+
+def build_service(latency: float) -> RAGService:
+    Config.ANSWER_CACHE_ENABLED = False
+    Config.MANIFEST_PATH = None
+    Config.LEXICAL_INDEX_PATH = None
+    manager = FakeVectorStoreManager()
+    docs = make_corpus()
+    manager.vector_store.add_documents(docs, ids=[d.metadata["chunk_id"] for d in docs])
+    return RAGService(vector_store_manager=manager, llm=FakeReActLLM(latency=latency))
+
+
+def run_blocking(service: RAGService, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        service.query(q)
+    return time.perf_counter() - start
+
+
+async def run_async(service: RAGService, queries) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(service.aquery(q) for q in queries))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /chat throughput with stubbed LLM and vector store.")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call in seconds.")
+    args = parser.parse_args()
+
+    service = build_service(args.latency)
+    queries = make_queries(args.clients)
+
+    blocking = run_blocking(service, queries)
+    concurrent = asyncio.run(run_async(service, queries))
+
+    print(json.dumps({
+        "benchmark": "concurrency",
+        "clients": args.clients,
+        "llm_latency_s": args.latency,
+        "blocking": {"wall_s": round(blocking, 4), "req_per_s": round(args.clients / blocking, 2)},
+        "async": {"wall_s": round(concurrent, 4), "req_per_s": round(args.clients / concurrent, 2)},
+        "speedup": round(blocking / concurrent, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
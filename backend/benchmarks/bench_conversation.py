@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import json
+import time
+
+from components.config import Config
+from components.metrics import METRICS
+from benchmarks.bench_concurrency import build_service
+from benchmarks.fakes import make_queries
+
+
+def prompt_tokens_total() -> float:
+    with METRICS.llm_tokens._lock:
+        return sum(v for (_, kind), v in METRICS.llm_tokens._values.items() if kind == "prompt")
+
+
+async def run(mode: str, args) -> list:
+    service = build_service(args.latency)
+    service.llm.prompt_latency_per_1k = args.prompt_latency_per_1k
+    history = []
+    turns = []
+    for turn, query in enumerate(make_queries(args.turns), start=1):
+        tokens_before = prompt_tokens_total()
+        start = time.perf_counter()
+        if mode == "client_history":
+            # Pre-checkpointing behaviour: a fresh thread every turn with the full transcript resent.
+            result = await service.aquery(query, list(history), f"client-{turn}")
+        else:
+            result = await service.aquery(query, [], "server-conversation")
+        turns.append({
+            "turn": turn,
+            "prompt_tokens": int(prompt_tokens_total() - tokens_before),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        history += [{"role": "user", "content": query}, {"role": "assistant", "content": result["response"]}]
+    return turns
+
+
+def summarize(turns: list) -> dict:
+    pick = {t["turn"]: t for t in turns}
+    marks = [m for m in (1, 10, 25, 50) if m in pick] + [turns[-1]["turn"]]
+    return {
+        "mean_prompt_tokens": round(sum(t["prompt_tokens"] for t in turns) / len(turns), 1),
+        "mean_latency_ms": round(sum(t["latency_ms"] for t in turns) / len(turns), 2),
+        "by_turn": {str(m): pick[m] for m in sorted(set(marks))},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn prompt tokens and latency over a long conversation.")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--prompt-latency-per-1k", type=float, default=0.02, help="Stub prefill cost per 1k prompt tokens.")
+    args = parser.parse_args()
+
+    window = Config.HISTORY_WINDOW_TURNS
+    Config.HISTORY_WINDOW_TURNS = 10 ** 6
+    before = asyncio.run(run("client_history", args))
+    Config.HISTORY_WINDOW_TURNS = window
+    after = asyncio.run(run("server_state", args))
+
+    print(json.dumps({
+        "benchmark": "conversation",
+        "turns": args.turns,
+        "history_window_turns": window,
+        "client_history": summarize(before),
+        "server_state": summarize(after),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""End-to-end benchmark of ingestion, queries and the HTTP API with fake models.
+
+Everything that normally needs Groq, OpenAI or a Chroma server is replaced
+by the deterministic fakes in ``benchmarks.fakes`` and a local vector store,
+so two runs on the same machine are comparable. The report is JSON; pass
+``--output`` to keep it for ``benchmarks.run_suite --compare``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from components.config import Config
+from components.vector_store import VectorStoreManager
+from rag_engine import RAGService
+from benchmarks.fakes import FakeReActLLM, FakeVectorStoreManager, HashingEmbeddings, TOPICS, write_synthetic_pdf
+from benchmarks.reporting import emit, latency_summary, peak_rss_mb, run_metadata
+
+
+def build_service(workdir: str, backend: str, latency: float, token_latency: float) -> RAGService:
+    Config.ANSWER_CACHE_ENABLED = False
+    Config.MANIFEST_PATH = os.path.join(workdir, "manifest.sqlite")
+    Config.LEXICAL_INDEX_PATH = os.path.join(workdir, "lexical_index.pkl")
+    Config.EMBEDDING_CACHE_PATH = os.path.join(workdir, "embedding_cache.sqlite")
+    Config.COLLECTION_NAME = "bench"
+    Config.BATCH_MAX_CONCURRENCY = 32
+    embeddings = HashingEmbeddings()
+    if backend == "memory":
+        manager = FakeVectorStoreManager(embeddings)
+    elif backend == "numpy":
+        manager = VectorStoreManager(backend="numpy", embedding_function=embeddings,
+                                     path=os.path.join(workdir, "vector_index"))
+    else:
+        manager = VectorStoreManager(backend="chroma_persistent", embedding_function=embeddings,
+                                     path=os.path.join(workdir, "chroma"))
+    llm = FakeReActLLM(latency=latency, token_latency=token_latency, verify_codes=True)
+    return RAGService(vector_store_manager=manager, llm=llm)
+
+
+def make_questions(n: int, docs: int, pages: int, lines_per_page: int) -> list:
+    # Matches the text write_synthetic_pdf puts on each page.
+    rng = random.Random(0)
+    questions = []
+    for _ in range(n):
+        p, l = rng.randrange(min(pages, 100)), rng.randrange(lines_per_page)
+        code = f"E{p % 100:02d}{l:03d}"
+        questions.append((f"What does code {code} on the {TOPICS[(p + l) % len(TOPICS)]} mean?", code))
+    return questions
+
+
+def bench_ingest(service: RAGService, paths: list, pages: int) -> dict:
+    start = time.perf_counter()
+    failures = 0
+    for path in paths:
+        message = service.ingest_file(path, os.path.basename(path))
+        failures += message.startswith("Error")
+    elapsed = time.perf_counter() - start
+    chunks = sum(d.get("chunks", 0) for d in service.list_documents())
+    return {
+        "files": len(paths),
+        "pages": pages * len(paths),
+        "chunks": chunks,
+        "failures": failures,
+        "wall_s": round(elapsed, 3),
+        "pages_per_s": round(pages * len(paths) / elapsed, 1),
+        "chunks_per_s": round(chunks / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_query(service: RAGService, questions: list) -> dict:
+    latencies, correct = [], 0
+    for question, code in questions:
+        start = time.perf_counter()
+        result = service.query(question)
+        latencies.append(time.perf_counter() - start)
+        correct += code in (result.get("response") or "")
+    return {"latency": latency_summary(latencies), "answer_accuracy": round(correct / len(questions), 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+def bench_query_stream(service: RAGService, questions: list) -> dict:
+    first_tokens, totals = [], []
+    for question, _ in questions:
+        start, first = time.perf_counter(), None
+        for line in service.query_stream(question):
+            if first is None and json.loads(line)["type"] == "token":
+                first = time.perf_counter() - start
+        totals.append(time.perf_counter() - start)
+        if first is not None:
+            first_tokens.append(first)
+    return {"first_token": latency_summary(first_tokens), "total": latency_summary(totals),
+            "peak_rss_mb": round(peak_rss_mb(), 1)}
+
+
+async def closed_loop(clients: int, per_client: int, questions: list, call) -> dict:
+    """``clients`` workers each send ``per_client`` requests back to back."""
+    latencies, errors = [], 0
+
+    async def worker(offset: int):
+        nonlocal errors
+        for i in range(per_client):
+            question, _ = questions[(offset * per_client + i) % len(questions)]
+            start = time.perf_counter()
+            try:
+                await call(question)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": clients * per_client,
+        "errors": errors,
+        "wall_s": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 2),
+        "latency": latency_summary(latencies),
+    }
+
+
+def start_server(service: RAGService):
+    import main
+
+    main.state.service = service
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def bench_endpoints(base_url: str, questions: list, clients: list, per_client: int, upload_path: str,
+                          repeats: int) -> dict:
+    limits = httpx.Limits(max_connections=max(clients) + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        report = {}
+        for method, path in (("GET", "/ready"), ("GET", "/documents"), ("GET", "/metrics")):
+            latencies = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                (await client.request(method, path)).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            report[f"{method} {path}"] = latency_summary(latencies)
+
+        async def chat(question):
+            (await client.post("/chat", json={"query": question})).raise_for_status()
+
+        report["POST /chat"] = {str(n): await closed_loop(n, per_client, questions, chat) for n in clients}
+
+        first_tokens, totals = [], []
+        for question, _ in questions[:repeats]:
+            start, first = time.perf_counter(), None
+            async with client.stream("POST", "/chat", json={"query": question, "stream": True}) as response:
+                async for line in response.aiter_lines():
+                    if first is None and line and json.loads(line)["type"] == "token":
+                        first = time.perf_counter() - start
+            totals.append(time.perf_counter() - start)
+            if first is not None:
+                first_tokens.append(first)
+        report["POST /chat (stream)"] = {"first_token": latency_summary(first_tokens), "total": latency_summary(totals)}
+
+        start, first, results = time.perf_counter(), None, 0
+        batch = {"queries": [q for q, _ in questions], "concurrency": max(clients)}
+        async with client.stream("POST", "/chat/batch", json=batch) as response:
+            async for line in response.aiter_lines():
+                if line and json.loads(line)["type"] == "result":
+                    results += 1
+                    first = first if first is not None else time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        report["POST /chat/batch"] = {
+            "questions": results,
+            "first_result_ms": round(first * 1000, 2) if first is not None else None,
+            "wall_s": round(elapsed, 3),
+            "questions_per_s": round(results / elapsed, 2),
+        }
+
+        start = time.perf_counter()
+        with open(upload_path, "rb") as f:
+            response = await client.post("/upload", files={"file": ("uploaded.pdf", f, "application/pdf")})
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        while True:
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.02)
+        report["POST /upload"] = {
+            "status": job["status"],
+            "pages": job["total_pages"],
+            "accepted_ms": round(response.elapsed.total_seconds() * 1000, 2),
+            "ingested_s": round(time.perf_counter() - start, 3),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ingest, query and HTTP benchmark with fake LLM and embeddings.")
+    parser.add_argument("--backend", choices=("numpy", "memory", "chroma_persistent"), default="numpy")
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=50, help="Pages per synthetic PDF.")
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--per-client", type=int, default=8, help="Requests per client in the throughput runs.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM latency per call in seconds.")
+    parser.add_argument("--token-latency", type=float, default=0.001, help="Fake LLM delay per streamed token.")
+    parser.add_argument("--skip-http", action="store_true", help="Skip the FastAPI endpoint phase.")
+    parser.add_argument("--output", help="Also write the JSON report to this path.")
+    args = parser.parse_args()
+
+    report = {"benchmark": "e2e", "meta": run_metadata(), "params": vars(args).copy()}
+    report["params"].pop("output")
+    with tempfile.TemporaryDirectory() as workdir:
+        # The upload endpoint stages files under ./temp_uploads.
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            service = build_service(workdir, args.backend, args.latency, args.token_latency)
+            paths = [write_synthetic_pdf(os.path.join(workdir, f"manual_{d}.pdf"), args.pages, args.lines_per_page)
+                     for d in range(args.docs)]
+            questions = make_questions(args.queries, args.docs, args.pages, args.lines_per_page)
+
+            report["ingest"] = bench_ingest(service, paths, args.pages)
+            report["query"] = bench_query(service, questions)
+            report["query_stream"] = bench_query_stream(service, questions)
+
+            async def aquery(question):
+                await service.aquery(question)
+
+            report["concurrency"] = {
+                str(n): asyncio.run(closed_loop(n, args.per_client, questions, aquery)) for n in args.clients
+            }
+            if not args.skip_http:
+                server, base_url = start_server(service)
+                try:
+                    report["endpoints"] = asyncio.run(bench_endpoints(
+                        base_url, questions, args.clients, args.per_client, paths[0], min(args.queries, 20)
+                    ))
+                finally:
+                    server.should_exit = True
+            report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        finally:
+            os.chdir(cwd)
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from components.document_processor import split_pages
+from components.extractors import get_extractor
+from benchmarks.fakes import write_synthetic_docx, write_synthetic_html, write_synthetic_pdf, write_synthetic_text
+from benchmarks.reporting import emit, run_metadata
+
+WRITERS = {
+    "pdf": write_synthetic_pdf,
+    "txt": write_synthetic_text,
+    "md": write_synthetic_text,
+    "html": write_synthetic_html,
+    "docx": write_synthetic_docx,
+}
+
+
+def forget_parse(path: str):
+    # Whole-file formats keep their last parse per process; time every phase cold.
+    get_extractor(path)._cached_key = None
+
+
+def bench_extract(path: str) -> dict:
+    forget_parse(path)
+    start = time.perf_counter()
+    total, texts = get_extractor(path).extract(path)
+    chars = sum(len(text) for text in texts)
+    elapsed = time.perf_counter() - start
+    return {
+        "pages": total,
+        "wall_s": round(elapsed, 3),
+        "pages_per_s": round(total / elapsed, 1),
+        "text_mb_per_s": round(chars / (1024 * 1024) / elapsed, 2),
+    }
+
+
+def bench_split(path: str, page_batch: int, pool=None) -> dict:
+    # The ingestion queue's parse step: page ranges split into chunks, optionally across processes.
+    total = get_extractor(path).count_pages(path)
+    forget_parse(path)
+    ranges = [(start, min(start + page_batch, total)) for start in range(0, total, page_batch)]
+    start = time.perf_counter()
+    if pool:
+        futures = [pool.submit(split_pages, path, os.path.basename(path), s, e) for s, e in ranges]
+        chunks = sum(len(f.result()) for f in futures)
+    else:
+        chunks = sum(len(split_pages(path, os.path.basename(path), s, e)) for s, e in ranges)
+    elapsed = time.perf_counter() - start
+    return {
+        "ranges": len(ranges),
+        "chunks": chunks,
+        "wall_s": round(elapsed, 3),
+        "pages_per_s": round(total / elapsed, 1),
+        "file_mb_per_s": round(os.path.getsize(path) / (1024 * 1024) / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction and chunking throughput per file format.")
+    parser.add_argument("--formats", nargs="+", choices=sorted(WRITERS), default=sorted(WRITERS))
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--page-batch", type=int, default=50, help="Pages per range handed to a pool process.")
+    parser.add_argument("--workers", type=int, default=max(2, min(4, os.cpu_count() or 1)))
+    parser.add_argument("--output", help="Also write the JSON report to this path.")
+    args = parser.parse_args()
+
+    report = {"benchmark": "extractors", "meta": run_metadata(), "params": vars(args).copy()}
+    report["params"].pop("output")
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Start the workers before timing so process spawn is not billed to the first format.
+        list(pool.map(abs, range(args.workers)))
+        for fmt in args.formats:
+            path = WRITERS[fmt](os.path.join(tmp, f"manual.{fmt}"), args.pages, args.lines_per_page)
+            serial = bench_split(path, args.page_batch)
+            parallel = bench_split(path, args.page_batch, pool)
+            report[fmt] = {
+                "file_mb": round(os.path.getsize(path) / (1024 * 1024), 2),
+                "extract": bench_extract(path),
+                "split_serial": serial,
+                "split_parallel": parallel,
+                "parallel_speedup": round(serial["wall_s"] / parallel["wall_s"], 2),
+            }
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fakes import NullVectorStore, write_synthetic_pdf
+from benchmarks.reporting import peak_rss_mb
+
+
+def ingest_eager(path: str, store: NullVectorStore):
+    # The pre-streaming pipeline: materialise all pages, split them all, one add_documents call.
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    docs = PyPDFLoader(path).load()
+    chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(docs)
+    store.add_documents(chunks, ids=[str(i) for i in range(len(chunks))])
+
+
+def ingest_streaming(path: str, store: NullVectorStore):
+    from components.document_processor import DocumentProcessor
+
+    DocumentProcessor(store, batch_size=64).process_file(path, os.path.basename(path))
+
+
+def child(mode: str, path: str):
+    store = NullVectorStore()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    (ingest_eager if mode == "eager" else ingest_streaming)(path, store)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "chunks": store.added,
+        "wall_s": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of PDF ingestion on synthetic PDFs of growing size.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 400, 1600])
+    parser.add_argument("--lines-per-page", type=int, default=60)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = write_synthetic_pdf(os.path.join(tmp, f"synthetic_{pages}.pdf"), pages, args.lines_per_page)
+            row = {"pages": pages, "file_mb": round(os.path.getsize(path) / (1024 * 1024), 2)}
+            for mode in ("eager", "streaming"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_ingest_memory", "--child", mode, path],
+                    capture_output=True, text=True, check=True
+                )
+                row[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(row)
+
+    print(json.dumps({"benchmark": "ingest_memory", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
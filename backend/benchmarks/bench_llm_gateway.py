@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+
+from components.config import Config
+from components.llm import LLMFactory
+from components.metrics import METRICS
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.reporting import percentile
+
+
+def gateway_events() -> dict:
+    with METRICS.llm_gateway._lock:
+        return {key[0]: value for key, value in METRICS.llm_gateway._values.items()}
+
+
+def make_prompts(n: int, duplicate_share: float) -> list:
+    rng = random.Random(0)
+    # Validator prompts for the same draft answer are byte-identical across concurrent retries.
+    shared = "Context: pump reset procedure.\nResponse: Reset the pump.\nReply 'VALID' or 'INVALID'."
+    return [shared if rng.random() < duplicate_share else f"Question {i}: what does error code E{i:05d} mean?"
+            for i in range(n)]
+
+
+async def run(llm, prompts, timeout: float) -> dict:
+    latencies, errors, timeouts = [], 0, 0
+
+    async def one(prompt):
+        nonlocal errors, timeouts
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(llm.ainvoke([HumanMessage(content=prompt)]), timeout)
+            latencies.append(time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            timeouts += 1
+        except Exception:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in prompts))
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "timeouts": timeouts,
+        "wall_s": round(time.perf_counter() - start, 3),
+        "latency_p50_s": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p95_s": round(percentile(latencies, 95), 3) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw Groq client vs LLM gateway against a rate-limited fake server.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.25, help="Share of identical (validator-style) prompts.")
+    parser.add_argument("--rpm", type=float, default=600, help="Server limit per model, requests per minute.")
+    parser.add_argument("--burst", type=float, default=0.1, help="Fraction of the minute budget usable at once.")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    Config.GROQ_API_KEY = "fake-key"
+    Config.MODEL_NAME = "primary-model"
+    Config.LLM_REQUESTS_PER_MINUTE = Config.FALLBACK_REQUESTS_PER_MINUTE = args.rpm
+    Config.LLM_TOKENS_PER_MINUTE = Config.FALLBACK_TOKENS_PER_MINUTE = 0
+    Config.LLM_RATE_BURST = args.burst
+    # The in-process server occasionally leaves a fresh connection unanswered; a short timeout turns that into a retry.
+    Config.LLM_TIMEOUT = 5
+    prompts = make_prompts(args.requests, args.duplicates)
+
+    def raw_client(retries: int):
+        Config.LLM_GATEWAY_ENABLED = retries == 0
+        llm = LLMFactory._chat_model(Config.MODEL_NAME)
+        Config.LLM_GATEWAY_ENABLED = True
+        return llm
+
+    def gateway(fallback: str = None):
+        Config.FALLBACK_MODEL_NAME = fallback
+        return LLMFactory.get_llm()
+
+    scenarios = [
+        ("raw_no_retries", lambda: raw_client(0)),
+        ("raw_sdk_retries", lambda: raw_client(2)),
+        ("gateway", lambda: gateway()),
+        ("gateway_with_fallback", lambda: gateway("fallback-model")),
+    ]
+    report = {"benchmark": "llm_gateway", "requests": len(prompts), "duplicate_share": args.duplicates,
+              "server_rpm_per_model": args.rpm, "server_burst": args.burst}
+
+    async def run_all():
+        # One loop for every scenario: the SDK's async HTTP clients are bound to the loop that opened them.
+        for label, factory in scenarios:
+            # A fresh server per scenario, so connections left over from a retry storm do not skew the next one.
+            server = FakeLLMServer(args.rpm, args.burst, args.latency)
+            Config.GROQ_BASE_URL = server.start()
+            before = gateway_events()
+            result = await run(factory(), prompts, args.request_timeout)
+            after = gateway_events()
+            server.stop()
+            result["upstream_requests"] = server.stats["requests"]
+            result["upstream_429s"] = server.stats["rate_limited"]
+            result["gateway_events"] = {k: v - before.get(k, 0) for k, v in after.items() if v - before.get(k, 0)}
+            report[label] = result
+
+    asyncio.run(run_all())
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
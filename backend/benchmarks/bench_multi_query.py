@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from components.metrics import METRICS
+from benchmarks.bench_rerank import build_service
+from benchmarks.fakes import make_corpus
+
+
+def llm_calls_total() -> float:
+    with METRICS.llm_calls._lock:
+        return sum(METRICS.llm_calls._values.values())
+
+
+async def run(service, cases) -> dict:
+    steps, calls, correct = [], [], 0
+    start = time.perf_counter()
+    for query, codes in cases:
+        before = llm_calls_total()
+        final = await service.rag_graph.arun(query, [], thread_id=str(uuid.uuid4()))
+        calls.append(llm_calls_total() - before)
+        steps.append(final.get("steps", 0))
+        correct += all(c in (final.get("response") or "") for c in codes)
+    return {
+        "mean_agent_steps": round(sum(steps) / len(steps), 3),
+        "mean_llm_calls": round(sum(calls) / len(calls), 3),
+        "answer_accuracy": round(correct / len(cases), 4),
+        "wall_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent steps per question with one vs several searches per ACTION step.")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--chunks-per-doc", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--max-parts", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM latency per call in seconds.")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.chunks_per_doc, filler_sentences=8)
+    rng = random.Random(0)
+    cases = []
+    for i in range(args.queries):
+        parts = rng.sample(corpus, 1 + i % args.max_parts)
+        codes = [d.page_content.split("error code ")[1].split()[0] for d in parts]
+        cases.append((f"What do error codes {' and '.join(codes)} mean?", codes))
+
+    service = build_service(corpus)
+    service.llm.latency = args.latency
+    report = {"benchmark": "multi_query", "queries": len(cases), "max_parts": args.max_parts,
+              "llm_latency_s": args.latency}
+    for label, multi_query in (("one_search_per_step", False), ("parallel_searches", True)):
+        service.llm.multi_query = multi_query
+        report[label] = asyncio.run(run(service, cases))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import random
+import uuid
+
+from components.config import Config
+from components.metrics import METRICS
+from components.reranking import build_reranker
+from rag_engine import RAGService
+from benchmarks.fakes import FakeReActLLM, FakeVectorStoreManager, make_corpus
+
+
+def prompt_tokens_total() -> float:
+    with METRICS.llm_tokens._lock:
+        return sum(v for (_, kind), v in METRICS.llm_tokens._values.items() if kind == "prompt")
+
+
+def build_service(corpus) -> RAGService:
+    Config.ANSWER_CACHE_ENABLED = False
+    Config.MANIFEST_PATH = None
+    Config.LEXICAL_INDEX_PATH = None
+    service = RAGService(vector_store_manager=FakeVectorStoreManager(), llm=FakeReActLLM(latency=0, verify_codes=True))
+    for source in sorted({d.metadata["source"] for d in corpus}):
+        update = service.doc_processor.begin_source(source)
+        service.doc_processor.add_chunks([d for d in corpus if d.metadata["source"] == source], update)
+        service.doc_processor.finish_source(update)
+    return service
+
+
+async def run(service: RAGService, cases) -> dict:
+    steps, tokens, chunks, searches, correct = [], [], 0, 0, 0
+    embeddings = service.vector_store_manager.vector_store.embeddings
+    embedded_before = embeddings.texts_embedded
+    for query, code in cases:
+        before = prompt_tokens_total()
+        final = await service.rag_graph.arun(query, [], thread_id=str(uuid.uuid4()))
+        tokens.append(prompt_tokens_total() - before)
+        steps.append(final.get("steps", 0))
+        for m in final.get("messages", []):
+            for section in m.additional_kwargs.get("observation", []):
+                chunks += len(section["chunk_ids"])
+                searches += 1
+        correct += code in (final.get("response") or "")
+    return {
+        "mean_agent_steps": round(sum(steps) / len(steps), 3),
+        "mean_prompt_tokens": round(sum(tokens) / len(tokens), 1),
+        "mean_chunks_per_search": round(chunks / max(1, searches), 2),
+        "mean_texts_embedded": round((embeddings.texts_embedded - embedded_before) / len(cases), 2),
+        "answer_accuracy": round(correct / len(cases), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt tokens and agent steps with and without reranking + context packing.")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--chunks-per-doc", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--filler", type=int, default=8, help="Filler sentences per chunk (~100 chars each).")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.chunks_per_doc, filler_sentences=args.filler)
+    rng = random.Random(0)
+    cases = []
+    for d in rng.sample(corpus, min(args.queries, len(corpus))):
+        code = d.page_content.split("error code ")[1].split()[0]
+        topic = d.page_content.split()[1]
+        cases.append((f"What does error code {code} on the {topic} mean?", code))
+
+    service = build_service(corpus)
+    embeddings = service.vector_store_manager.vector_store.embeddings
+    lexical_index = service.rag_graph.lexical_index
+    report = {"benchmark": "rerank", "corpus_chunks": len(corpus), "queries": len(cases),
+              "context_token_budget": Config.CONTEXT_TOKEN_BUDGET}
+    for retrieval, index in (("hybrid", lexical_index), ("vector_only", None)):
+        service.rag_graph.lexical_index = index
+        report[retrieval] = {}
+        for label, kind in (("interleave_top5", "none"), ("mmr_packed", "mmr")):
+            service.rag_graph.reranker = build_reranker(embeddings, kind)
+            report[retrieval][label] = asyncio.run(run(service, cases))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from components.lexical_index import BM25Index
+from components.rag_graph import RAGGraph
+from benchmarks.fakes import HashingEmbeddings, make_corpus
+from benchmarks.reporting import percentile
+
+
+async def evaluate(graph: RAGGraph, cases, k: int):
+    hits_at_k, hits_at_5, latencies = 0, 0, []
+    for query, chunk_id in cases:
+        candidates = await graph._search(query, k=k)
+        start = time.perf_counter()
+        selected = await graph._retrieve_docs(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits_at_k += any(d.metadata.get("chunk_id") == chunk_id for d in candidates[:k])
+        hits_at_5 += any(s["chunk_id"] == chunk_id for s in selected["sources"])
+    return {
+        f"recall@{k}": round(hits_at_k / len(cases), 4),
+        "recall@5_selected": round(hits_at_5 / len(cases), 4),
+        "latency_ms_p50": round(statistics.median(latencies), 3),
+        "latency_ms_p95": round(percentile(latencies, 95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline recall/latency of vector-only vs hybrid (BM25 + RRF) retrieval.")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--chunks-per-doc", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.chunks_per_doc)
+    ids = [d.metadata["chunk_id"] for d in corpus]
+    store = InMemoryVectorStore(HashingEmbeddings())
+    store.add_documents(corpus, ids=ids)
+
+    start = time.perf_counter()
+    index = BM25Index()
+    index.add(ids, corpus)
+    build_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.path = os.path.join(tmp, "lexical_index.pkl")
+        index.save()
+        start = time.perf_counter()
+        BM25Index.load(index.path)
+        load_s = time.perf_counter() - start
+
+    rng = random.Random(0)
+    sample = rng.sample(corpus, min(args.queries, len(corpus)))
+    cases = [
+        (f"What does error code {d.page_content.split('error code ')[1].split()[0]} mean?", d.metadata["chunk_id"])
+        for d in sample
+    ]
+
+    vector_only = asyncio.run(evaluate(RAGGraph(None, store), cases, args.k))
+    hybrid = asyncio.run(evaluate(RAGGraph(None, store, lexical_index=index), cases, args.k))
+
+    print(json.dumps({
+        "benchmark": "retrieval",
+        "corpus_chunks": len(corpus),
+        "queries": len(cases),
+        "lexical_index": {"build_s": round(build_s, 4), "load_s": round(load_s, 4)},
+        "vector_only": vector_only,
+        "hybrid": hybrid,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("langchain_core", "langgraph", "chromadb", "langchain_openai", "langchain_groq")
+
+
+def import_profile(module: str) -> dict:
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is encoded as two extra spaces of indent per level.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((depth, name.strip(), int(cumulative_us)))
+    total_us = next(us for depth, name, us in modules if depth == 0 and name == module)
+    children = [(name, us) for depth, name, us in modules if depth == 1]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "heavy_modules_loaded": [m for m in proc.stdout.strip().split(",") if m],
+        "top": [{"module": name, "ms": round(us / 1000, 1)}
+                for name, us in sorted(children, key=lambda item: -item[1])[:5]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost of the API module versus the eagerly built RAG service.")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    report = {"benchmark": "startup", "runs": args.runs}
+    for module in ("main", "rag_engine"):
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        report[module] = {
+            "median_total_ms": round(statistics.median(p["total_ms"] for p in profiles), 1),
+            "heavy_modules_loaded": profiles[-1]["heavy_modules_loaded"],
+            "top": profiles[-1]["top"],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from components.config import Config
+from components.llm import LLMGateway, RateLimiter
+from benchmarks.bench_concurrency import build_service
+from benchmarks.fakes import make_queries
+from benchmarks.reporting import percentile
+
+
+async def measure(service, query: str) -> dict:
+    start = time.perf_counter()
+    marks, tokens = {}, []
+    async for line in service.aquery_stream(query):
+        event = json.loads(line)
+        elapsed = (time.perf_counter() - start) * 1000
+        if event["type"] == "token":
+            tokens.append(event["content"])
+            marks.setdefault("first_token", elapsed)
+        elif event["type"] == "thinking" and "FINAL_ANSWER:" in event["content"].upper():
+            marks.setdefault("answer_node_done", elapsed)
+        elif event["type"] == "final":
+            marks["final"] = elapsed
+            # Tokens delivered twice (e.g. a wrapper model re-emitting its inner model's) would not add up.
+            marks["stream_matches_final"] = not tokens or "".join(tokens).strip() == event["response"].strip()
+    return marks
+
+
+def summarize(samples, key):
+    values = [s[key] for s in samples if key in s]
+    if not values:
+        return None
+    return {"p50_ms": round(statistics.median(values), 2), "p95_ms": round(percentile(values, 95), 2)}
+
+
+async def run(args):
+    service = build_service(args.latency)
+    service.llm.token_latency = args.token_latency
+    if args.gateway:
+        # As LLMFactory deploys it by default.
+        service.rag_graph.llm = LLMGateway(models=[service.llm], limiters=[RateLimiter()])
+    samples = []
+    for query in make_queries(args.queries):
+        samples.append(await measure(service, query))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-token of streamed answers with a stub streaming LLM.")
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM time to first token in seconds.")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Stub LLM delay per token in seconds.")
+    parser.add_argument("--gateway", action=argparse.BooleanOptionalAction, default=Config.LLM_GATEWAY_ENABLED,
+                        help="Route the stub LLM through LLMGateway (default: LLM_GATEWAY_ENABLED).")
+    args = parser.parse_args()
+
+    samples = asyncio.run(run(args))
+    mismatched = sum(not s.get("stream_matches_final", True) for s in samples)
+    print(json.dumps({
+        "benchmark": "ttft",
+        "queries": len(samples),
+        "llm_latency_s": args.latency,
+        "token_latency_s": args.token_latency,
+        "gateway": args.gateway,
+        "stream_mismatches": mismatched,
+        "first_token": summarize(samples, "first_token"),
+        "whole_node_answer": summarize(samples, "answer_node_done"),
+        "final_event": summarize(samples, "final"),
+    }, indent=2))
+    if mismatched:
+        raise SystemExit(f"{mismatched} streamed answers did not match their final response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import json
+import time
+
+from components.metrics import METRICS
+from components.validators import TieredValidator
+from benchmarks.bench_concurrency import build_service
+from benchmarks.fakes import make_queries
+
+
+def validation_counts() -> dict:
+    with METRICS.validations._lock:
+        return {f"{tier}_{verdict}": int(v) for (tier, verdict), v in METRICS.validations._values.items()}
+
+
+def counter_total(counter, **labels) -> int:
+    # Summed over the labels not given, as a /metrics query would.
+    key = tuple(str(labels.get(n, "")) if n in labels else None for n in counter.labels)
+    with counter._lock:
+        return int(sum(v for k, v in counter._values.items()
+                       if all(want is None or want == got for want, got in zip(key, k))))
+
+
+async def run(mode: str, args) -> dict:
+    service = build_service(args.latency)
+    service.llm.hallucinate_every = args.hallucinate_every
+    service.rag_graph.validator = TieredValidator(service.llm, mode=mode)
+    for counter in (METRICS.validations, METRICS.validation_llm_calls, METRICS.validation_local_accepts):
+        counter._values.clear()
+
+    llm_calls, retries = 0, 0
+    start = time.perf_counter()
+    for query in make_queries(args.queries):
+        with METRICS.request("bench") as trace:
+            state = await service.rag_graph.arun(query, [])
+        llm_calls += trace.llm_calls
+        retries += state.get("retry_count", 0)
+    elapsed = time.perf_counter() - start
+
+    counts = validation_counts()
+    return {
+        "wall_s": round(elapsed, 3),
+        "llm_calls": llm_calls,
+        "llm_validation_calls": sum(v for k, v in counts.items() if k.startswith("llm_")),
+        "local_decisions": sum(v for k, v in counts.items() if k.startswith("local_")),
+        "retries": retries,
+        "metrics_llm_validation_calls": counter_total(METRICS.validation_llm_calls, outcome="made"),
+        "metrics_llm_validation_calls_avoided": counter_total(METRICS.validation_llm_calls, outcome="avoided"),
+        "metrics_local_accepts": counter_total(METRICS.validation_local_accepts),
+        "decisions": counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM validation calls and retries: LLM judge vs tiered validator.")
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--hallucinate-every", type=int, default=5, help="Every Nth stub answer is ungrounded.")
+    args = parser.parse_args()
+
+    results = {mode: asyncio.run(run(mode, args)) for mode in ("llm", "tiered")}
+    results["llm_validation_calls_avoided"] = results["llm"]["llm_validation_calls"] - results["tiered"]["llm_validation_calls"]
+    # Only measurable against a judge-only run of the same questions.
+    results["retries_avoided"] = results["llm"]["retries"] - results["tiered"]["retries"]
+    print(json.dumps({"benchmark": "validation", "queries": args.queries, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
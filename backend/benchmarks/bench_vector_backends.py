@@ -0,0 +1,102 @@
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from components.config import Config
+from components.vector_store import VectorStoreManager
+from benchmarks.fakes import HashingEmbeddings, make_corpus, make_queries
+from benchmarks.reporting import percentile
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Serves vectors computed up front so timings reflect the store, not the embedder."""
+
+    def __init__(self, texts: List[str], underlying: Embeddings):
+        self.underlying = underlying
+        self._vectors = dict(zip(texts, underlying.embed_documents(texts)))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vectors.get(t) or self.underlying.embed_query(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def bench_backend(name: str, options: dict, corpus, cases, embeddings, batch_size: int, k: int) -> dict:
+    manager = VectorStoreManager(backend=name, embedding_function=embeddings, **options)
+    store = manager.vector_store
+    manager.delete_collection()
+
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        batch = corpus[offset:offset + batch_size]
+        store.add_documents(documents=batch, ids=[d.metadata["chunk_id"] for d in batch])
+    manager.persist()
+    ingest_s = time.perf_counter() - start
+
+    store.similarity_search(cases[0][0], k=k)
+    latencies, hits, targeted = [], 0, 0
+    for query, chunk_id in cases:
+        start = time.perf_counter()
+        docs = store.similarity_search(query, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if chunk_id:
+            targeted += 1
+            hits += any(d.metadata["chunk_id"] == chunk_id for d in docs)
+    manager.delete_collection()
+    return {
+        "ingest_chunks_per_s": round(len(corpus) / ingest_s, 1),
+        "query_ms_p50": round(statistics.median(latencies), 3),
+        "query_ms_p95": round(percentile(latencies, 95), 3),
+        f"recall@{k}": round(hits / targeted, 4) if targeted else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query latency and ingest throughput across vector store backends.")
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--chunks-per-doc", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=Config.INGEST_BATCH_SIZE)
+    parser.add_argument("--chroma-host", help="Also benchmark a running Chroma server (host:port).")
+    args = parser.parse_args()
+
+    Config.EMBEDDING_CACHE_ENABLED = False
+    Config.COLLECTION_NAME = "bench_backends"
+    corpus = make_corpus(args.docs, args.chunks_per_doc)
+    # Half free-text questions for latency, half chunk texts whose source chunk must come back.
+    half = args.queries // 2
+    stride = max(1, len(corpus) // max(1, args.queries - half))
+    cases = [(q, None) for q in make_queries(half)]
+    cases += [(d.page_content, d.metadata["chunk_id"]) for d in corpus[::stride]][:args.queries - half]
+    embeddings = PrecomputedEmbeddings([d.page_content for d in corpus] + [q for q, _ in cases], HashingEmbeddings(size=args.dim))
+
+    tmp = tempfile.mkdtemp(prefix="bench_backends_")
+    backends = [
+        ("numpy_flat", "numpy", {"path": f"{tmp}/numpy_flat", "index": "flat"}),
+        ("numpy_ivf", "numpy", {"path": f"{tmp}/numpy_ivf", "index": "ivf"}),
+        ("chroma_persistent", "chroma_persistent", {"path": f"{tmp}/chroma"}),
+    ]
+    if args.chroma_host:
+        host, _, port = args.chroma_host.partition(":")
+        Config.CHROMA_HOST, Config.CHROMA_PORT = host, int(port or 8000)
+        backends.append(("chroma_http", "chroma_http", {}))
+
+    report = {"benchmark": "vector_backends", "chunks": len(corpus), "queries": len(cases), "dim": args.dim, "k": args.k}
+    for label, name, options in backends:
+        try:
+            report[label] = bench_backend(name, options, corpus, cases, embeddings, args.batch_size, args.k)
+        except Exception as e:
+            report[label] = {"error": str(e)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
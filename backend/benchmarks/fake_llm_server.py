@@ -0,0 +1,105 @@
+"""Groq/OpenAI-compatible chat completions server with per-model rate limits.
+
+Point the backend at it with GROQ_BASE_URL=http://127.0.0.1:<port>. Requests
+over a model's budget get a 429 with a Retry-After header, like the real API.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from components.llm import TokenBucket
+
+
+class FakeLLMServer:
+    def __init__(self, requests_per_minute: float = 600, burst: float = 0.1, latency: float = 0.05):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.latency = latency
+        self.buckets = {}
+        self.stats = {"requests": 0, "rate_limited": 0, "completed": 0}
+        self.app = self._build_app()
+        self._server = None
+
+    def _bucket(self, model: str) -> TokenBucket:
+        if model not in self.buckets:
+            self.buckets[model] = TokenBucket(self.requests_per_minute, self.requests_per_minute * self.burst)
+        return self.buckets[model]
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/openai/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            model = body.get("model", "default")
+            self.stats["requests"] += 1
+            bucket = self._bucket(model)
+            wait = bucket.wait_time(1)
+            if wait > 0:
+                self.stats["rate_limited"] += 1
+                return JSONResponse(
+                    status_code=429,
+                    content={"error": {"message": f"Rate limit reached for model {model}", "type": "tokens", "code": "rate_limit_exceeded"}},
+                    headers={"retry-after": f"{wait:.2f}"}
+                )
+            bucket.reserve(1)
+            await asyncio.sleep(self.latency)
+            prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+            content = f"FINAL_ANSWER: echo from {model}: {prompt[-80:]}"
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            self.stats["completed"] += 1
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            if body.get("stream"):
+                async def events():
+                    for piece in content.split(" "):
+                        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                                 "choices": [{"index": 0, "delta": {"content": piece + " "}, "finish_reason": None}]}
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                    done = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+                    yield f"data: {json.dumps(done)}\n\n"
+                    yield "data: [DONE]\n\n"
+                return StreamingResponse(events(), media_type="text/event-stream")
+            return {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        return app
+
+    def start(self, port: int = 0) -> str:
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="error")
+        self._server = uvicorn.Server(config)
+        threading.Thread(target=self._server.run, daemon=True).start()
+        while not self._server.started:
+            time.sleep(0.01)
+        bound = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{bound}"
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a rate-limited fake Groq chat completions server.")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--rpm", type=float, default=600)
+    parser.add_argument("--burst", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    server = FakeLLMServer(args.rpm, args.burst, args.latency)
+    uvicorn.run(server.app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import math
+import re
+import time
+import zipfile
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.vectorstores import InMemoryVectorStore
+
+TOKEN_RE = re.compile(r"\w+")
+CODE_RE = re.compile(r"\bE\d{5}\b")
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_RE.findall(text))
+
+
+class FakeReActLLM(BaseChatModel):
+    latency: float = 0.05
+    token_latency: float = 0.0
+    prompt_latency_per_1k: float = 0.0
+    hallucinate_every: int = 0
+    verify_codes: bool = False
+    multi_query: bool = False
+    answers: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-react"
+
+    def _search(self, queries: List[str]) -> str:
+        if self.multi_query:
+            return "\n".join(f'ACTION: search_documents("{q}")' for q in queries)
+        return f'ACTION: search_documents("{queries[0]}")'
+
+    def _reply(self, messages) -> str:
+        last = messages[-1].content
+        if "'VALID' or 'INVALID'" in last:
+            context, _, rest = last.partition("\nResponse: ")
+            response = rest.rsplit("\nReply", 1)[0].strip()
+            return "VALID" if response and all(part in context for part in response.split(" | ")) else "INVALID"
+        question = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        # verify_codes: an agent that searches again when an asked-about error code is not in context yet.
+        codes = CODE_RE.findall(question) if self.verify_codes else []
+        if last.startswith("OBSERVATION:"):
+            observed = "\n".join(m.content for m in messages if m.content.startswith("OBSERVATION:"))
+            missing = [c for c in codes if c not in observed]
+            searches = sum(1 for m in messages if m.content.startswith("OBSERVATION:"))
+            if missing and searches < 2 + len(codes):
+                return self._search([f"error code {c}" for c in missing])
+            body = [l for l in observed[len("OBSERVATION:"):].strip().splitlines()
+                    if l and not l.startswith("[") and not l.startswith("OBSERVATION:")]
+            matched = [next((l for l in body if c in l), None) for c in codes]
+            matched = [l for l in dict.fromkeys(matched) if l]
+            text = " | ".join(l[:200] for l in matched) if matched else (body[0][:200] if body else "No answer.")
+            self.answers += 1
+            if self.hallucinate_every and self.answers % self.hallucinate_every == 0:
+                text = "Quarterly revenue grew strongly thanks to aggressive marketing campaigns overseas."
+            return f"FINAL_ANSWER: {text}"
+        if len(codes) > 1:
+            return self._search([f"error code {c}" for c in codes])
+        return f'ACTION: search_documents("{question}")'
+
+    def _result(self, messages) -> ChatResult:
+        content = self._reply(messages)
+        prompt_tokens = sum(count_tokens(m.content) for m in messages)
+        completion_tokens = count_tokens(content)
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _delay(self, message) -> float:
+        prefill = self.prompt_latency_per_1k * message.usage_metadata["input_tokens"] / 1000
+        return self.latency + prefill + self.token_latency * message.usage_metadata["output_tokens"]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result = self._result(messages)
+        time.sleep(self._delay(result.generations[0].message))
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result = self._result(messages)
+        await asyncio.sleep(self._delay(result.generations[0].message))
+        return result
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._result(messages).generations[0].message
+        await asyncio.sleep(self.latency + self.prompt_latency_per_1k * message.usage_metadata["input_tokens"] / 1000)
+        for piece in re.findall(r"\S+\s*|\s+", message.content):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata))
+
+
+class HashingEmbeddings(Embeddings):
+    embeds_queries_as_documents = True
+
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vec = [0.0] * self.size
+        for tok in TOKEN_RE.findall(text.lower()):
+            h = int.from_bytes(hashlib.md5(tok.encode()).digest()[:4], "little")
+            vec[h % self.size] += 1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeVectorStoreManager:
+    def __init__(self, embedding_function=None):
+        self._embedding_function = embedding_function or HashingEmbeddings()
+        self._vector_store = InMemoryVectorStore(self._embedding_function)
+        self._change_listeners = []
+
+    @property
+    def vector_store(self):
+        return self._vector_store
+
+    def add_change_listener(self, callback):
+        self._change_listeners.append(callback)
+
+    def persist(self):
+        pass
+
+    def delete_collection(self):
+        self._vector_store = InMemoryVectorStore(self._embedding_function)
+        for callback in self._change_listeners:
+            callback()
+
+
+class NullVectorStore:
+    def __init__(self, embedding_function=None):
+        self.embeddings = embedding_function or HashingEmbeddings()
+        self.added = 0
+
+    def add_documents(self, documents, ids=None, **kwargs):
+        self.embeddings.embed_documents([d.page_content for d in documents])
+        self.added += len(documents)
+        return ids or []
+
+    def delete(self, ids=None, **kwargs):
+        return None
+
+
+TOPICS = [
+    "pump", "valve", "sensor", "battery", "firmware", "network", "cooling", "motor",
+    "display", "warranty", "calibration", "filter", "bearing", "router", "compressor",
+]
+
+
+def make_corpus(n_docs: int = 5, chunks_per_doc: int = 40, filler_sentences: int = 0) -> List[Document]:
+    docs = []
+    for d in range(n_docs):
+        for c in range(chunks_per_doc):
+            topic = TOPICS[(d * chunks_per_doc + c) % len(TOPICS)]
+            code = f"E{d:02d}{c:03d}"
+            text = (
+                f"The {topic} module of unit {d} reports error code {code} when the {topic} "
+                f"is outside its operating range. Reset the {topic} and check wiring on page {c + 1}."
+            )
+            # Padding brings chunks closer to the ~1000 character splitter output of real manuals.
+            for f in range(filler_sentences):
+                other = TOPICS[(d + c + f) % len(TOPICS)]
+                text += f" Routine maintenance of the {other} follows the schedule in section {f + 1} of the service guide."
+            docs.append(Document(
+                page_content=text,
+                metadata={"source": f"manual_{d}.pdf", "page": c + 1, "chunk_id": f"{d}-{c}", "chunk_index": c},
+            ))
+    return docs
+
+
+def make_queries(n: int = 20) -> List[str]:
+    return [f"What does error code E{i % 5:02d}{i:03d} on the {TOPICS[i % len(TOPICS)]} mean?" for i in range(n)]
+
+
+def synthetic_page_lines(page: int, lines_per_page: int) -> list:
+    return [
+        f"Page {page + 1} line {l}: the {TOPICS[(page + l) % len(TOPICS)]} reports code E{page % 100:02d}{l:03d}."
+        for l in range(lines_per_page)
+    ]
+
+
+def write_synthetic_pdf(path: str, pages: int = 50, lines_per_page: int = 40) -> str:
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for p in range(pages):
+        lines = synthetic_page_lines(p, lines_per_page)
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"] + [f"({line}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % r for r in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for i, obj in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % i + obj + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for off in offsets:
+            f.write(b"%010d 00000 n \n" % off)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return path
+
+
+def write_synthetic_text(path: str, pages: int = 50, lines_per_page: int = 40) -> str:
+    # Pages separated by form feeds, as text exports of paged documents are.
+    with open(path, "w", encoding="utf-8") as f:
+        for p in range(pages):
+            if p:
+                f.write("\f")
+            f.write(f"# Page {p + 1}\n\n" + "\n".join(synthetic_page_lines(p, lines_per_page)) + "\n")
+    return path
+
+
+def write_synthetic_html(path: str, pages: int = 50, lines_per_page: int = 40) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><head><title>Manual</title><style>p { margin: 0 }</style></head><body>\n")
+        for p in range(pages):
+            f.write(f"<section><h2>Page {p + 1}</h2>\n")
+            f.write("".join(f"<p>{line}</p>\n" for line in synthetic_page_lines(p, lines_per_page)))
+            f.write("</section><script>track();</script>\n")
+        f.write("</body></html>\n")
+    return path
+
+
+def write_synthetic_docx(path: str, pages: int = 50, lines_per_page: int = 40) -> str:
+    from xml.sax.saxutils import escape
+
+    body = []
+    for p in range(pages):
+        if p:
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        body.extend(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in synthetic_page_lines(p, lines_per_page))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        + "".join(body) + "</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>"
+        ))
+        archive.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            "</Relationships>"
+        ))
+        archive.writestr("word/document.xml", document)
+    return path
@@ -0,0 +1,137 @@
+"""Run the benchmark suite and compare results across commits.
+
+Each benchmark runs in its own interpreter (module imports and Config
+overrides do not leak between them) and prints a JSON report; the suite
+collects them into one file under ``benchmarks/results/``:
+
+    python -m benchmarks.run_suite --quick
+    python -m benchmarks.run_suite --quick --compare benchmarks/results/<old>.json
+
+With ``--compare`` the exit status is 1 when any metric regressed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.reporting import BACKEND_DIR, emit, run_metadata
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Module name -> arguments for --quick runs; full runs use each benchmark's own defaults.
+SUITE = {
+    "bench_e2e": ["--docs", "2", "--pages", "20", "--queries", "20", "--clients", "1", "8", "--per-client", "4"],
+    "bench_startup": ["--runs", "2"],
+    "bench_concurrency": ["--clients", "10"],
+    "bench_ttft": ["--queries", "10"],
+    "bench_retrieval": ["--docs", "5", "--chunks-per-doc", "40", "--queries", "50"],
+    "bench_rerank": ["--docs", "5", "--chunks-per-doc", "40", "--queries", "30"],
+    "bench_agent_context": ["--docs", "5", "--chunks-per-doc", "40", "--queries", "20"],
+    "bench_batch": ["--questions", "40"],
+    "bench_multi_query": ["--docs", "5", "--chunks-per-doc", "40", "--queries", "20"],
+    "bench_validation": ["--queries", "20"],
+    "bench_conversation": ["--turns", "10"],
+    "bench_vector_backends": ["--docs", "5", "--chunks-per-doc", "200", "--queries", "50"],
+    "bench_ingest_memory": ["--pages", "50", "200"],
+    "bench_extractors": ["--pages", "100"],
+    "bench_llm_gateway": ["--requests", "100"],
+}
+
+HIGHER_IS_BETTER = ("per_s", "accuracy", "recall", "speedup", "hit_rate", "ok")
+LOWER_IS_BETTER = ("_ms", "_s", "_mb", "tokens", "steps", "calls", "errors", "timeouts", "failures", "429s")
+# Sub-millisecond swings on fast endpoints are scheduler noise, whatever the percentage.
+MIN_DELTA_MS = 1.0
+
+
+def run_benchmark(name: str, args: list) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-m", f"benchmarks.{name}", *args],
+                          cwd=BACKEND_DIR, capture_output=True, text=True)
+    elapsed = round(time.perf_counter() - start, 1)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}",
+                "runtime_s": elapsed}
+    # Components may log before the report; it is the last top-level JSON object on stdout.
+    lines = proc.stdout.splitlines()
+    start_line = max(i for i, line in enumerate(lines) if line.startswith("{"))
+    report = json.loads("\n".join(lines[start_line:]))
+    report.pop("meta", None)
+    report["runtime_s"] = elapsed
+    return report
+
+
+def flatten(value, prefix: str = "") -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def direction(path: str) -> int:
+    leaf = path.rsplit(".", 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER) or leaf.startswith("recall"):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """Metrics that moved by more than ``threshold`` (a fraction), worst regressions first."""
+    rows = []
+    for name in sorted(set(old.get("benchmarks", {})) & set(new.get("benchmarks", {}))):
+        before = flatten(old["benchmarks"][name])
+        after = flatten(new["benchmarks"][name])
+        for path in sorted(set(before) & set(after)):
+            if path.startswith("params.") or path == "runtime_s":
+                continue
+            a, b = before[path], after[path]
+            change = (b - a) / abs(a) if a else (0.0 if b == a else float("inf"))
+            if abs(change) < threshold or (path.endswith("_ms") and abs(b - a) < MIN_DELTA_MS):
+                continue
+            sign = direction(path)
+            verdict = "changed" if not sign else ("improved" if change * sign > 0 else "regressed")
+            rows.append({"metric": f"{name}.{path}", "old": a, "new": b, "change": round(change, 4), "verdict": verdict})
+    order = {"regressed": 0, "changed": 1, "improved": 2}
+    return sorted(rows, key=lambda r: (order[r["verdict"]], -abs(r["change"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmarks and write one JSON report per commit.")
+    parser.add_argument("benchmarks", nargs="*", help=f"Subset to run (default: all). Available: {', '.join(SUITE)}")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, for comparing commits quickly.")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/<commit>[-quick].json).")
+    parser.add_argument("--compare", help="Earlier report to diff against.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Ignore changes smaller than this fraction.")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in SUITE]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    meta = run_metadata()
+    report = {"meta": meta, "quick": args.quick, "benchmarks": {}}
+    for name in args.benchmarks or SUITE:
+        print(f"running {name}...", file=sys.stderr, flush=True)
+        report["benchmarks"][name] = run_benchmark(name, SUITE[name] if args.quick else [])
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["compared_to"] = baseline.get("meta", {}).get("commit")
+        report["changes"] = compare(baseline, report, args.threshold)
+
+    label = f"{meta['commit'] or 'unknown'}{'-dirty' if meta['dirty'] else ''}{'-quick' if args.quick else ''}"
+    emit(report, args.output or os.path.join(RESULTS_DIR, f"{label}.json"))
+    if any(r["verdict"] == "regressed" for r in report.get("changes", [])):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.95, ttl: float = 3600, max_entries: int = 512):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_key = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding):
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _expire(self, now: float):
+        expired = [k for k, (_, _, ts) in self._entries.items() if now - ts > self.ttl]
+        for k in expired:
+            del self._entries[k]
+            self.evictions += 1
+
+    def lookup(self, embedding):
+        vec = self._normalize(embedding)
+        with self._lock:
+            self._expire(time.monotonic())
+            best_key, best_score = None, -1.0
+            for key, (cached_vec, _, _) in self._entries.items():
+                score = float(np.dot(vec, cached_vec))
+                if score > best_score:
+                    best_key, best_score = key, score
+            if best_key is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.hits += 1
+                return dict(self._entries[best_key][1])
+            self.misses += 1
+            return None
+
+    def store(self, embedding, result: dict, generation: int = None):
+        vec = self._normalize(embedding)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[self._next_key] = (vec, dict(result), time.monotonic())
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -12,3 +12,66 @@ class Config:
     COLLECTION_NAME = os.getenv("COLLECTION_NAME")
     MODEL_NAME = os.getenv("MODEL_NAME")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "db/embedding_cache.sqlite")
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "16"))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", "2"))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+    INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+    INGEST_PAGE_BATCH = int(os.getenv("INGEST_PAGE_BATCH", "50"))
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    MANIFEST_PATH = os.getenv("MANIFEST_PATH", "db/manifest.sqlite") or None
+    LEXICAL_INDEX_ENABLED = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+    LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "db/lexical_index.pkl") or None
+    RRF_K = int(os.getenv("RRF_K", "60"))
+    VALIDATOR_MODE = os.getenv("VALIDATOR_MODE", "tiered")
+    VALIDATOR_LOW_SCORE = float(os.getenv("VALIDATOR_LOW_SCORE", "0.35"))
+    VALIDATOR_HIGH_SCORE = float(os.getenv("VALIDATOR_HIGH_SCORE", "0.75"))
+    VALIDATOR_MAX_CONTEXT_CHUNKS = int(os.getenv("VALIDATOR_MAX_CONTEXT_CHUNKS", "4"))
+    CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "memory")
+    CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "db/conversations.sqlite")
+    CONVERSATION_TTL = float(os.getenv("CONVERSATION_TTL", "3600"))
+    HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "6"))
+    HISTORY_SUMMARY_CHARS = int(os.getenv("HISTORY_SUMMARY_CHARS", "2000"))
+    CHROMA_CONNECT_RETRIES = int(os.getenv("CHROMA_CONNECT_RETRIES", "5"))
+    CHROMA_CONNECT_BACKOFF = float(os.getenv("CHROMA_CONNECT_BACKOFF", "0.5"))
+    SERVICE_INIT_MAX_BACKOFF = float(os.getenv("SERVICE_INIT_MAX_BACKOFF", "30"))
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma_http")
+    CHROMA_PERSIST_PATH = os.getenv("CHROMA_PERSIST_PATH", "db/chroma")
+    NUMPY_INDEX_PATH = os.getenv("NUMPY_INDEX_PATH", "db/vector_index") or None
+    NUMPY_INDEX_TYPE = os.getenv("NUMPY_INDEX_TYPE", "flat")
+    NUMPY_IVF_NLIST = int(os.getenv("NUMPY_IVF_NLIST", "0"))
+    NUMPY_IVF_NPROBE = int(os.getenv("NUMPY_IVF_NPROBE", "8"))
+    AGENT_MAX_LISTED_DOCUMENTS = int(os.getenv("AGENT_MAX_LISTED_DOCUMENTS", "20"))
+    RERANKER = os.getenv("RERANKER", "mmr")
+    RERANK_MMR_LAMBDA = float(os.getenv("RERANK_MMR_LAMBDA", "0.7"))
+    RERANK_PRIOR_WEIGHT = float(os.getenv("RERANK_PRIOR_WEIGHT", "0.5"))
+    RERANK_MIN_RELATIVE_SCORE = float(os.getenv("RERANK_MIN_RELATIVE_SCORE", "0.7"))
+    CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+    CONTEXT_MAX_CHUNKS = int(os.getenv("CONTEXT_MAX_CHUNKS", "6"))
+    AGENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "4000"))
+    MAX_QUERIES_PER_ACTION = int(os.getenv("MAX_QUERIES_PER_ACTION", "4"))
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+    FALLBACK_MODEL_NAME = os.getenv("FALLBACK_MODEL_NAME") or None
+    LLM_GATEWAY_ENABLED = os.getenv("LLM_GATEWAY_ENABLED", "true").lower() == "true"
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "6000"))
+    FALLBACK_REQUESTS_PER_MINUTE = float(os.getenv("FALLBACK_REQUESTS_PER_MINUTE", "30"))
+    FALLBACK_TOKENS_PER_MINUTE = float(os.getenv("FALLBACK_TOKENS_PER_MINUTE", "6000"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_MAX_QUEUE_WAIT = float(os.getenv("LLM_MAX_QUEUE_WAIT", "2"))
+    LLM_COALESCE = os.getenv("LLM_COALESCE", "true").lower() == "true"
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_RATE_BURST = float(os.getenv("LLM_RATE_BURST", "1.0"))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "500"))
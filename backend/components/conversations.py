@@ -0,0 +1,148 @@
+import os
+import time
+from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+
+async def open_checkpointer(kind: str = "memory", path: str = None):
+    """Open the conversation checkpointer on the event loop that will use it.
+
+    AsyncSqliteSaver binds to the running loop and needs an open, set-up
+    connection, so this cannot happen in a worker thread or at import time.
+    """
+    if kind == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError:
+            print("langgraph-checkpoint-sqlite is not installed; keeping conversations in memory.")
+            return MemorySaver()
+        path = path or "db/conversations.sqlite"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        saver = AsyncSqliteSaver(await aiosqlite.connect(path))
+        await saver.setup()
+        return saver
+    return MemorySaver()
+
+
+async def close_checkpointer(checkpointer):
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None:
+        await conn.close()
+
+
+def client_turns(chat_history: list) -> list:
+    # Assistant messages before the first question are greetings, not context.
+    chat_history = chat_history or []
+    first = next((i for i, m in enumerate(chat_history) if m.get("role") == "user"), len(chat_history))
+    return chat_history[first:]
+
+
+def history_from_client(chat_history: list) -> list:
+    msgs = []
+    for m in client_turns(chat_history):
+        if m.get("role") == "user": msgs.append(HumanMessage(content=m["content"]))
+        elif m.get("role") == "assistant": msgs.append(AIMessage(content=m["content"]))
+    return msgs
+
+
+def window_history(history: list, summary: str, window_turns: int, summary_chars: int):
+    # Keep the last window_turns user/assistant pairs verbatim and fold older turns into a bounded summary.
+    keep = window_turns * 2
+    if len(history) <= keep:
+        return history, summary
+
+    older, recent = history[:len(history) - keep], history[len(history) - keep:]
+    lines = [summary] if summary else []
+    for m in older:
+        role = "User" if isinstance(m, HumanMessage) else "Assistant"
+        lines.append(f"{role}: {m.content[:300]}")
+    summary = "\n".join(lines)
+    if len(summary) > summary_chars:
+        summary = summary[-summary_chars:]
+        summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+    return recent, summary
+
+
+class ConversationStore:
+    """Last-activity times per thread, and eviction of threads idle past ``ttl``.
+
+    With a sqlite checkpointer the times live in a table next to the
+    checkpoints, so conversations abandoned before a restart still expire.
+    """
+
+    def __init__(self, checkpointer, ttl: float = 3600, sweep_interval: float = 60):
+        self.checkpointer = checkpointer
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._conn = getattr(checkpointer, "conn", None)
+        self._table_ready = False
+        self._last_seen = {}
+        self._last_sweep = time.monotonic()
+
+    async def _ensure_table(self):
+        if self._table_ready:
+            return
+        async with self.checkpointer.lock:
+            await self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_activity (thread_id TEXT PRIMARY KEY, last_seen REAL)"
+            )
+            # Threads stored before activity was tracked start their idle clock now.
+            await self._conn.execute(
+                "INSERT OR IGNORE INTO conversation_activity (thread_id, last_seen) "
+                "SELECT DISTINCT thread_id, ? FROM checkpoints", (time.time(),)
+            )
+            await self._conn.commit()
+        self._table_ready = True
+
+    async def atouch(self, thread_id: str):
+        if self._conn is None:
+            self._last_seen[thread_id] = time.time()
+            return
+        await self._ensure_table()
+        async with self.checkpointer.lock:
+            await self._conn.execute(
+                "INSERT INTO conversation_activity (thread_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen", (thread_id, time.time())
+            )
+            await self._conn.commit()
+
+    async def _idle_threads(self, cutoff: float) -> list:
+        if self._conn is None:
+            idle = [t for t, seen in self._last_seen.items() if seen < cutoff]
+            for thread_id in idle:
+                del self._last_seen[thread_id]
+            return idle
+        await self._ensure_table()
+        async with self.checkpointer.lock:
+            async with self._conn.execute(
+                "SELECT thread_id FROM conversation_activity WHERE last_seen < ?", (cutoff,)
+            ) as cursor:
+                idle = [row[0] for row in await cursor.fetchall()]
+            await self._conn.executemany(
+                "DELETE FROM conversation_activity WHERE thread_id = ?", [(t,) for t in idle]
+            )
+            await self._conn.commit()
+        return idle
+
+    async def aforget(self, thread_id: str):
+        self._last_seen.pop(thread_id, None)
+        if self._conn is not None:
+            await self._ensure_table()
+            async with self.checkpointer.lock:
+                await self._conn.execute("DELETE FROM conversation_activity WHERE thread_id = ?", (thread_id,))
+                await self._conn.commit()
+        await self.checkpointer.adelete_thread(thread_id)
+
+    async def evict_idle(self, force: bool = False) -> list:
+        now = time.monotonic()
+        if not force and now - self._last_sweep < self.sweep_interval:
+            return []
+        self._last_sweep = now
+        idle = await self._idle_threads(time.time() - self.ttl)
+        for thread_id in idle:
+            try:
+                await self.checkpointer.adelete_thread(thread_id)
+            except Exception as e:
+                print(f"Failed to evict conversation {thread_id}: {e}")
+        return idle
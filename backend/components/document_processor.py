@@ -1,49 +1,138 @@
-import os
-import uuid
-from langchain_community.document_loaders import PyPDFLoader
+import hashlib
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .extractors import get_extractor
+
+def count_pages(file_path: str, original_filename: str) -> int:
+    return get_extractor(original_filename).count_pages(file_path)
+
+def iter_pages(file_path: str, original_filename: str, start_page: int = 0, end_page: int = None):
+    total_pages, texts = get_extractor(original_filename).extract(file_path, start_page, end_page)
+    for i, text in enumerate(texts, start=start_page):
+        yield Document(
+            page_content=text,
+            metadata={"source": original_filename, "page": i + 1, "total_pages": total_pages}
+        )
+
+def iter_chunks(file_path: str, original_filename: str, start_page: int = 0, end_page: int = None,
+                chunk_size: int = 1000, chunk_overlap: int = 200):
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for page in iter_pages(file_path, original_filename, start_page, end_page):
+        for chunk in text_splitter.split_documents([page]):
+            yield chunk
+
+def content_chunk_id(source: str, page, content: str) -> str:
+    return hashlib.sha256(f"{source}\x00{page}\x00{content}".encode("utf-8")).hexdigest()
+
+def split_pages(file_path: str, original_filename: str, start_page: int = 0, end_page: int = None) -> list:
+    return list(iter_chunks(file_path, original_filename, start_page, end_page))
+
+class SourceUpdate:
+    def __init__(self, source: str, existing_ids: set):
+        self.source = source
+        self.existing_ids = existing_ids
+        self.seen_ids = set()
+        self.pages = None
+        self.added = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def report(self) -> dict:
+        return {"added": self.added, "unchanged": self.unchanged, "removed": self.removed}
 
 class DocumentProcessor:
-    def __init__(self, vector_store):
+    def __init__(self, vector_store, on_change=None, batch_size: int = 64, manifest=None, lexical_index=None):
         self.vector_store = vector_store
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        self.on_change = on_change
+        self.batch_size = batch_size
+        self.manifest = manifest
+        self.lexical_index = lexical_index
+
+    def _stored_ids(self, source: str) -> set:
+        if self.manifest and self.manifest.has_source(source):
+            return self.manifest.chunk_ids(source)
+        # Sources ingested before the manifest existed: look their chunks up in the collection.
+        try:
+            return set(self.vector_store.get(where={"source": source}, include=[])["ids"])
+        except Exception:
+            return set()
 
-    def process_pdf(self, file_path: str, original_filename: str) -> str:
+    def begin_source(self, source: str) -> SourceUpdate:
+        return SourceUpdate(source, self._stored_ids(source))
+
+    def _flush(self, batch: list, progress=None):
+        ids = [chunk.metadata["chunk_id"] for chunk in batch]
+        self.vector_store.add_documents(documents=batch, ids=ids)
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, batch)
+        if progress:
+            progress(len(batch))
+
+    def add_chunks(self, chunks, update: SourceUpdate, progress=None, start_index: int = 0) -> int:
+        batch = []
+        count = 0
+        for chunk in chunks:
+            chunk.metadata.setdefault("page", 0)
+            if chunk.metadata.get("total_pages"):
+                update.pages = chunk.metadata["total_pages"]
+            chunk_id = content_chunk_id(update.source, chunk.metadata["page"], chunk.page_content)
+            chunk.metadata["chunk_id"] = chunk_id
+            chunk.metadata["chunk_index"] = start_index + count
+            count += 1
+
+            if chunk_id in update.seen_ids or chunk_id in update.existing_ids:
+                if chunk_id not in update.seen_ids:
+                    update.unchanged += 1
+                update.seen_ids.add(chunk_id)
+                if progress:
+                    progress(1)
+                continue
+            update.seen_ids.add(chunk_id)
+
+            update.added += 1
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, progress)
+                batch = []
+        if batch:
+            self._flush(batch, progress)
+        return count
+
+    def finish_source(self, update: SourceUpdate) -> dict:
+        stale = list(update.existing_ids - update.seen_ids)
+        for start in range(0, len(stale), self.batch_size):
+            self.vector_store.delete(ids=stale[start:start + self.batch_size])
+        update.removed = len(stale)
+        # Local indexes (NumpyVectorStore) write to disk once per source, not per batch.
+        persist = getattr(self.vector_store, "persist", None)
+        if persist and (update.added or update.removed):
+            persist()
+
+        if self.lexical_index is not None:
+            self.lexical_index.delete(stale)
+            if update.added or update.removed:
+                self.lexical_index.save()
+
+        if self.manifest:
+            self.manifest.replace(update.source, update.seen_ids, pages=update.pages)
+        if (update.added or update.removed) and self.on_change:
+            self.on_change()
+        return update.report()
+
+    def process_file(self, file_path: str, original_filename: str) -> str:
         try:
-            loader = PyPDFLoader(file_path)
-            docs = loader.load()
-            
-            for i, doc in enumerate(docs):
-                doc.metadata["source"] = original_filename
-                
-                page_meta = doc.metadata.get("page")
-                if page_meta is None:
-                    page_meta = doc.metadata.get("page_label") or doc.metadata.get("page_number")
-                
-                if page_meta is not None:
-                    try:
-                        doc.metadata["page"] = int(page_meta) + 1
-                    except:
-                        doc.metadata["page"] = i + 1
-                else:
-                    doc.metadata["page"] = i + 1
-
-            chunks = self.text_splitter.split_documents(docs)
-            if not chunks:
-                return "No content extracted from PDF."
-
-            for i, chunk in enumerate(chunks):
-                chunk.metadata["chunk_id"] = str(uuid.uuid4())
-                chunk.metadata["chunk_index"] = i
-                
-                if "source" not in chunk.metadata:
-                    chunk.metadata["source"] = original_filename
-                
-                if "page" not in chunk.metadata:
-                    chunk.metadata["page"] = 0
-
-            ids = [chunk.metadata["chunk_id"] for chunk in chunks]
-            self.vector_store.add_documents(documents=chunks, ids=ids)
-            return f"Successfully processed {original_filename}."
+            update = self.begin_source(original_filename)
+            count = self.add_chunks(iter_chunks(file_path, original_filename), update)
+            # Finish even when nothing was extracted, so an emptied file drops its old chunks.
+            report = self.finish_source(update)
+            if not count and not update.existing_ids:
+                return f"No content extracted from {original_filename}."
+            return (
+                f"Successfully processed {original_filename}: {report['added']} added, "
+                f"{report['unchanged']} unchanged, {report['removed']} removed."
+            )
         except Exception as e:
-            return f"Error processing PDF: {str(e)}"
+            return f"Error processing {original_filename}: {str(e)}"
+
+    # Kept for callers written before other formats were supported.
+    process_pdf = process_file
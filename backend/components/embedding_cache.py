@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Models whose embed_query is embed_documents([text])[0], so queries can share document batches.
+SYMMETRIC_QUERY_MODELS = {"OpenAIEmbeddings", "AzureOpenAIEmbeddings"}
+
+
+def embeds_queries_as_documents(model: Embeddings) -> bool:
+    if getattr(model, "embeds_queries_as_documents", False):
+        return True
+    # Embeddings leaves embed_query abstract, so look at which class actually implements it.
+    owner = next(c for c in type(model).__mro__ if "embed_query" in vars(c))
+    return owner is Embeddings or owner.__name__ in SYMMETRIC_QUERY_MODELS
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, underlying: Embeddings, store_path: str = None, namespace: str = "",
+                 max_memory_entries: int = 10000, batch_size: int = 64):
+        self.underlying = underlying
+        self.namespace = namespace
+        self.max_memory_entries = max_memory_entries
+        self.batch_size = max(1, batch_size)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if store_path:
+            os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(store_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # float32 arrays, ~4 bytes per dimension; a list of Python floats costs ~8x that.
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_many(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+            missing = [k for k in keys if k not in found]
+            if self._db and missing:
+                for start in range(0, len(missing), 500):
+                    part = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+        return found
+
+    def _put_many(self, items: dict):
+        items = {k: np.asarray(v, dtype=np.float32) for k, v in items.items()}
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(k, v.tobytes()) for k, v in items.items()]
+                )
+                self._db.commit()
+
+    def _embed_many(self, kind: str, texts: List[str], embed=None) -> List[List[float]]:
+        embed = embed or self.underlying.embed_documents
+        keys = [self._key(kind, t) for t in texts]
+        found = self._get_many(keys)
+
+        pending = OrderedDict()
+        for key, text in zip(keys, texts):
+            if key not in found:
+                pending[key] = text
+        miss_count = sum(1 for k in keys if k not in found)
+        self.hits += len(keys) - miss_count
+        self.misses += miss_count
+
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), self.batch_size):
+            batch = pending_keys[start:start + self.batch_size]
+            vectors = embed([pending[k] for k in batch])
+            self.batches += 1
+            computed = dict(zip(batch, vectors))
+            self._put_many(computed)
+            found.update(computed)
+
+        return [np.asarray(found[k], dtype=np.float32).tolist() for k in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_many("doc", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        found = self._get_many([key])
+        if key in found:
+            self.hits += 1
+            return found[key].tolist()
+        self.misses += 1
+        vector = self.underlying.embed_query(text)
+        self._put_many({key: vector})
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed many queries and cache them for ``embed_query``.
+
+        Models that embed queries and documents alike, as OpenAI's do, get
+        batched ``embed_documents`` calls; any other model is asked through
+        its own ``embed_query``, one text per call, concurrently.
+        """
+        if embeds_queries_as_documents(self.underlying):
+            return self._embed_many("query", texts)
+        return self._embed_many("query", texts, self._embed_queries_concurrently)
+
+    def _embed_queries_concurrently(self, texts: List[str]) -> List[List[float]]:
+        with ThreadPoolExecutor(max_workers=min(len(texts), 8)) as pool:
+            return list(pool.map(self.underlying.embed_query, texts))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "batches": self.batches,
+        }
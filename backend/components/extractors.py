@@ -0,0 +1,175 @@
+"""Text extraction per file format.
+
+Extractors return a file's page count and the text of a page range, so the
+ingestion queue can hand ranges of a large file to different processes.
+Formats without real pages split on explicit page breaks (form feeds in
+text, page breaks in DOCX) and are otherwise a single page.
+"""
+import os
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Iterator, Tuple
+from xml.etree import ElementTree
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+class PdfExtractor:
+    name = "pdf"
+    extensions = (".pdf",)
+
+    def count_pages(self, path: str) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(path).pages)
+
+    def extract(self, path: str, start: int = 0, end: int = None) -> Tuple[int, Iterator[str]]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        total = len(reader.pages)
+        end = total if end is None else min(end, total)
+        # Lazy, so a whole-file extraction still holds one page at a time.
+        return total, (reader.pages[i].extract_text() or "" for i in range(start, end))
+
+
+class PagedTextExtractor(ABC):
+    """Base for formats parsed whole; subclasses return the list of page texts."""
+
+    _cached_key = None
+    _cached_pages = None
+
+    @abstractmethod
+    def pages(self, path: str) -> list:
+        """Every page of the file at ``path``, in order."""
+
+    def _pages(self, path: str) -> list:
+        # Each range of a file is extracted separately; keep the last parse per process
+        # so a file is not re-read and re-parsed once per range.
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if self._cached_key != key:
+            self._cached_key, self._cached_pages = None, self.pages(path)
+            self._cached_key = key
+        return self._cached_pages
+
+    def count_pages(self, path: str) -> int:
+        return len(self._pages(path))
+
+    def extract(self, path: str, start: int = 0, end: int = None) -> Tuple[int, Iterator[str]]:
+        pages = self._pages(path)
+        return len(pages), iter(pages[start:end])
+
+
+class TextExtractor(PagedTextExtractor):
+    name = "text"
+    extensions = (".txt", ".text", ".md", ".markdown")
+
+    def pages(self, path: str) -> list:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read().split("\f")
+
+
+class _HTMLText(HTMLParser):
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+    BLOCK = {
+        "p", "div", "br", "hr", "li", "ul", "ol", "tr", "table", "section", "article", "header", "footer",
+        "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "title", "dt", "dd",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        text = re.sub(r"[ \t\r\f\v]+", " ", "".join(self.parts))
+        return re.sub(r"\s*\n\s*", "\n", text).strip()
+
+
+class HtmlExtractor(PagedTextExtractor):
+    name = "html"
+    extensions = (".html", ".htm", ".xhtml")
+
+    def pages(self, path: str) -> list:
+        parser = _HTMLText()
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for block in iter(lambda: f.read(1 << 16), ""):
+                parser.feed(block)
+        parser.close()
+        return [parser.text()]
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class DocxExtractor(PagedTextExtractor):
+    name = "docx"
+    extensions = (".docx",)
+
+    def pages(self, path: str) -> list:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open("word/document.xml") as f:
+                root = ElementTree.parse(f).getroot()
+        pages, paragraphs, parts = [], [], []
+        for paragraph in root.iter(f"{_W}p"):
+            for node in paragraph.iter():
+                if node.tag == f"{_W}t" and node.text:
+                    parts.append(node.text)
+                elif node.tag == f"{_W}tab":
+                    parts.append("\t")
+                elif node.tag == f"{_W}br" and node.get(f"{_W}type") == "page":
+                    paragraphs.append("".join(parts))
+                    pages.append("\n".join(paragraphs))
+                    paragraphs, parts = [], []
+                elif node.tag in (f"{_W}br", f"{_W}cr"):
+                    parts.append("\n")
+            paragraphs.append("".join(parts))
+            parts = []
+        pages.append("\n".join(paragraphs))
+        return pages
+
+
+EXTRACTORS = {}
+
+
+def register_extractor(extractor):
+    for extension in extractor.extensions:
+        EXTRACTORS[extension] = extractor
+
+
+for _extractor in (PdfExtractor(), TextExtractor(), HtmlExtractor(), DocxExtractor()):
+    register_extractor(_extractor)
+
+
+def supported_extensions() -> list:
+    return sorted(EXTRACTORS)
+
+
+def get_extractor(filename: str):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXTRACTORS:
+        raise UnsupportedFormatError(
+            f"Unsupported file type '{extension or filename}'. Supported: {', '.join(supported_extensions())}"
+        )
+    return EXTRACTORS[extension]
@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+_COMPARATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def combine_where(*clauses: Optional[dict]) -> Optional[dict]:
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    # Chroma rejects an "$and" with fewer than two operands.
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def build_where(sources: Optional[List[str]] = None, page_from: Optional[int] = None,
+                page_to: Optional[int] = None) -> Optional[dict]:
+    """Translate request-level source/page scoping into a Chroma ``where`` filter."""
+    clauses = []
+    if sources:
+        clauses.append({"source": sources[0]} if len(sources) == 1 else {"source": {"$in": list(sources)}})
+    if page_from is not None:
+        clauses.append({"page": {"$gte": page_from}})
+    if page_to is not None:
+        clauses.append({"page": {"$lte": page_to}})
+    return combine_where(*clauses)
+
+
+def where_sources(where: Optional[dict]) -> Optional[set]:
+    """Sources a filter is restricted to, or None when it allows every source."""
+    if not where:
+        return None
+    if "$and" in where:
+        scoped = [s for s in (where_sources(c) for c in where["$and"]) if s is not None]
+        return set.intersection(*scoped) if scoped else None
+    condition = where.get("source")
+    if condition is None:
+        return None
+    if isinstance(condition, dict):
+        if "$in" in condition:
+            return set(condition["$in"])
+        if "$eq" in condition:
+            return {condition["$eq"]}
+        return None
+    return {condition}
+
+
+def match_where(metadata: dict, where: Optional[dict]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one metadata dict."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(match_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(match_where(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op not in _COMPARATORS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not _COMPARATORS[op](value, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
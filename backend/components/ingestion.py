@@ -0,0 +1,179 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from .metrics import METRICS
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class IngestionJob:
+    def __init__(self, filename: str, file_path: str):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.file_path = file_path
+        self.status = "queued"
+        self.message = ""
+        self.total_pages = 0
+        self.processed_pages = 0
+        self.total_chunks = 0
+        self.processed_chunks = 0
+        self.report = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def advance(self, count: int):
+        self.processed_chunks += count
+
+    def to_dict(self) -> dict:
+        progress = self.processed_pages / self.total_pages if self.total_pages else 0.0
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "message": self.message,
+            "total_pages": self.total_pages,
+            "processed_pages": self.processed_pages,
+            "total_chunks": self.total_chunks,
+            "processed_chunks": self.processed_chunks,
+            "progress": round(progress, 4),
+            "report": self.report,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestionQueue:
+    def __init__(self, doc_processor, max_pending: int = 16, workers: int = 2,
+                 process_workers: int = 2, job_history: int = 200, page_batch: int = 50):
+        self.doc_processor = doc_processor
+        self.max_pending = max_pending
+        self.workers = workers
+        self.process_workers = process_workers
+        self.job_history = job_history
+        self.page_batch = max(1, page_batch)
+        self.jobs = OrderedDict()
+        self._queue = None
+        self._tasks = []
+        self._pool = None
+        # source -> [lock, holders]; jobs for one filename run one at a time.
+        self._source_locks = {}
+
+    def _ensure_started(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        # Spawned, not forked: the server process already runs threads (the event loop's executor,
+        # Chroma's client) whose locks a forked child could inherit while they are held.
+        self._pool = ProcessPoolExecutor(max_workers=self.process_workers,
+                                         mp_context=multiprocessing.get_context("spawn"))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j.finished_at is not None]
+        for job in finished[:max(0, len(self.jobs) - self.job_history)]:
+            del self.jobs[job.id]
+
+    def submit(self, file_path: str, filename: str) -> IngestionJob:
+        self._ensure_started()
+        job = IngestionJob(filename, file_path)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Ingestion queue is full ({self.max_pending} pending jobs). Retry later.")
+        self.jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJob):
+        entry = self._source_locks.setdefault(job.filename, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            # Two updates of one source would each diff against the same stored chunks and keep their own.
+            async with entry[0]:
+                with METRICS.request("ingest_job") as trace:
+                    await self._process(job)
+                    if job.status == "failed":
+                        trace.outcome = "error"
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._source_locks[job.filename]
+
+    async def _process(self, job: IngestionJob):
+        from .document_processor import count_pages, split_pages
+
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            job.status = "parsing"
+            update = await loop.run_in_executor(None, self.doc_processor.begin_source, job.filename)
+            job.total_pages = await loop.run_in_executor(self._pool, count_pages, job.file_path, job.filename)
+            ranges = [(start, min(start + self.page_batch, job.total_pages))
+                      for start in range(0, job.total_pages, self.page_batch)]
+
+            # Keep one page range per pool process parsing while earlier ranges are embedded in order,
+            # so at most process_workers + 1 ranges are in memory.
+            queued = iter(ranges)
+            for _, end in ranges:
+                for start_page, end_page in queued:
+                    pending.append(loop.run_in_executor(
+                        self._pool, split_pages, job.file_path, job.filename, start_page, end_page
+                    ))
+                    if len(pending) >= max(1, self.process_workers):
+                        break
+                chunks = await pending.popleft()
+
+                job.status = "embedding"
+                start_index = job.total_chunks
+                job.total_chunks += len(chunks)
+                await loop.run_in_executor(
+                    None, self.doc_processor.add_chunks, chunks, update, job.advance, start_index
+                )
+                job.processed_pages = end
+
+            # Finish even when nothing was extracted, so an emptied file drops its old chunks.
+            job.report = await loop.run_in_executor(None, self.doc_processor.finish_source, update)
+            if job.total_chunks or update.existing_ids:
+                job.message = (
+                    f"Successfully processed {job.filename}: {job.report['added']} added, "
+                    f"{job.report['unchanged']} unchanged, {job.report['removed']} removed."
+                )
+            else:
+                job.message = f"No content extracted from {job.filename}."
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.message = f"Error processing {job.filename}: {str(e)}"
+        finally:
+            for future in pending:
+                future.cancel()
+            job.finished_at = time.time()
+            if os.path.exists(job.file_path):
+                os.remove(job.file_path)
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._queue = None
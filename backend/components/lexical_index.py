@@ -0,0 +1,123 @@
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from langchain_core.documents import Document
+from .filters import match_where
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "does", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "which", "who", "why", "with",
+}
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, path: str = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._docs = {}
+        self._postings = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "BM25Index":
+        index = cls(path, **kwargs)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    data = pickle.load(f)
+                index._docs = data["docs"]
+                index._postings = data["postings"]
+                index._total_length = data["total_length"]
+            except Exception as e:
+                print(f"Failed to load lexical index from {path}: {e}")
+        return index
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"docs": self._docs, "postings": self._postings, "total_length": self._total_length}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _remove_locked(self, chunk_id: str):
+        entry = self._docs.pop(chunk_id, None)
+        if not entry:
+            return
+        _, _, length, terms = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add(self, ids: list, documents: list):
+        with self._lock:
+            for chunk_id, doc in zip(ids, documents):
+                self._remove_locked(chunk_id)
+                counts = Counter(tokenize(doc.page_content))
+                length = sum(counts.values())
+                self._docs[chunk_id] = (doc.page_content, dict(doc.metadata), length, tuple(counts))
+                self._total_length += length
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[chunk_id] = tf
+
+    def delete(self, ids: list):
+        with self._lock:
+            for chunk_id in ids:
+                self._remove_locked(chunk_id)
+
+    def clear(self):
+        with self._lock:
+            self._docs = {}
+            self._postings = {}
+            self._total_length = 0
+        self.save()
+
+    def search(self, query: str, k: int = 20, where: dict = None) -> list:
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores = {}
+            allowed = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    if where:
+                        if chunk_id not in allowed:
+                            allowed[chunk_id] = match_where(self._docs[chunk_id][1], where)
+                        if not allowed[chunk_id]:
+                            continue
+                    length = self._docs[chunk_id][2]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [
+                (Document(page_content=self._docs[cid][0], metadata=dict(self._docs[cid][1])), score)
+                for cid, score in top
+            ]
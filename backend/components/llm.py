@@ -1,13 +1,311 @@
-from langchain_groq import ChatGroq
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
 from .config import Config
+from .metrics import METRICS
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+def estimate_prompt_tokens(messages) -> int:
+    return sum(max(1, len(str(m.content)) // 4) for m in messages)
+
+
+def status_code(exc: Exception) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+
+def is_retryable(exc: Exception) -> bool:
+    return status_code(exc) in RETRYABLE_STATUS or type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    return status_code(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Full jitter: concurrent callers that failed together do not retry together.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Per-minute budget; callers reserve up front and sleep off any deficit.
+
+    Reserving ahead (the balance may go negative) queues callers in arrival
+    order instead of letting them race once capacity frees up.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, capacity or per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            return max(0.0, (amount - self._tokens) / self.rate)
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float):
+        with self._lock:
+            self._tokens -= amount
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets for one model; 0 disables a limit.
+
+    ``burst`` is the fraction of a minute's budget that may be spent at once.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0, burst: float = 1.0):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute * burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute * burst) if tokens_per_minute else None
+        self._blocked_until = 0.0
+
+    def _buckets(self, tokens: int):
+        return [(b, n) for b, n in ((self.requests, 1), (self.tokens, tokens)) if b]
+
+    def wait_time(self, tokens: int) -> float:
+        blocked = max(0.0, self._blocked_until - time.monotonic())
+        return max([blocked] + [b.wait_time(n) for b, n in self._buckets(tokens)])
+
+    def reserve(self, tokens: int) -> float:
+        blocked = max(0.0, self._blocked_until - time.monotonic())
+        return max([blocked] + [b.reserve(n) for b, n in self._buckets(tokens)])
+
+    def settle(self, estimated: int, actual: int):
+        if self.tokens and actual:
+            self.tokens.adjust(actual - estimated)
+
+    def pause(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class LLMGateway(BaseChatModel):
+    """Schedules calls across a primary model and optional fallbacks.
+
+    Each model has its own RateLimiter. A call goes to the first model whose
+    queue wait is under ``max_queue_wait``; a 429 pauses that model's limiter
+    so the next attempt can move to a fallback. Identical non-streaming
+    prompts already in flight share one upstream call.
+    """
+
+    models: List[Any]
+    limiters: List[Any]
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_cap: float = 20.0
+    max_queue_wait: float = 2.0
+    coalesce: bool = True
+
+    _inflight: dict = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-gateway"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.models[0], "model_name", type(self.models[0]).__name__)
+
+    def _pick(self, tokens: int) -> int:
+        waits = [limiter.wait_time(tokens) for limiter in self.limiters]
+        for index, wait in enumerate(waits):
+            if wait <= self.max_queue_wait:
+                break
+        else:
+            index = min(range(len(waits)), key=waits.__getitem__)
+        if index:
+            METRICS.llm_gateway.inc(event="fallback")
+        return index
+
+    def _on_error(self, exc: Exception, index: int, attempt: int) -> float:
+        if attempt >= self.max_retries or not is_retryable(exc):
+            raise exc
+        METRICS.llm_gateway.inc(event="retry")
+        delay = retry_after(exc) or backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        if is_rate_limited(exc):
+            METRICS.llm_gateway.inc(event="rate_limited")
+            self.limiters[index].pause(delay)
+            # The paused limiter steers the next attempt; only sleep if nothing else can take it.
+            return 0.0 if len(self.models) > 1 else delay
+        return delay
+
+    # The inner models are called below their public invoke/stream API on purpose: those would open
+    # a child run under the caller's callbacks, and LangGraph's message stream would then see every
+    # token twice, once from the inner model and once from the gateway's own run.
+    async def _agenerate_with(self, index: int, messages, stop, **kwargs):
+        result = await self.models[index]._agenerate(messages, stop=stop, **kwargs)
+        return result.generations[0].message
+
+    def _generate_with(self, index: int, messages, stop, **kwargs):
+        return self.models[index]._generate(messages, stop=stop, **kwargs).generations[0].message
+
+    @staticmethod
+    def _usage(message) -> int:
+        usage = getattr(message, "usage_metadata", None) or {}
+        return usage.get("total_tokens", 0) or 0
+
+    async def _acall(self, messages, stop, **kwargs):
+        tokens = estimate_prompt_tokens(messages)
+        attempt = 0
+        while True:
+            index = self._pick(tokens)
+            await asyncio.sleep(self.limiters[index].reserve(tokens))
+            try:
+                message = await self._agenerate_with(index, messages, stop, **kwargs)
+                self.limiters[index].settle(tokens, self._usage(message))
+                return message
+            except Exception as e:
+                delay = self._on_error(e, index, attempt)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _coalesce_key(self, messages, stop, kwargs) -> str:
+        payload = json.dumps(
+            [[m.type, m.content] for m in messages] + [stop, sorted(kwargs.items()), id(asyncio.get_running_loop())],
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if not self.coalesce:
+            message = await self._acall(messages, stop, **kwargs)
+        else:
+            key = self._coalesce_key(messages, stop, kwargs)
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._acall(messages, stop, **kwargs))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            else:
+                METRICS.llm_gateway.inc(event="coalesced")
+            message = await asyncio.shield(task)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = estimate_prompt_tokens(messages)
+        attempt = 0
+        while True:
+            index = self._pick(tokens)
+            await asyncio.sleep(self.limiters[index].reserve(tokens))
+            started = False
+            used = 0
+            try:
+                async for chunk in self.models[index]._astream(messages, stop=stop, **kwargs):
+                    started = True
+                    message = chunk.message
+                    used += self._usage(message)
+                    yield ChatGenerationChunk(message=AIMessageChunk(
+                        content=message.content, usage_metadata=getattr(message, "usage_metadata", None),
+                        response_metadata=message.response_metadata
+                    ))
+                self.limiters[index].settle(tokens, used)
+                return
+            except Exception as e:
+                # Tokens already reached the client; a silent retry would splice two answers.
+                if started:
+                    raise
+                delay = self._on_error(e, index, attempt)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = estimate_prompt_tokens(messages)
+        attempt = 0
+        while True:
+            index = self._pick(tokens)
+            time.sleep(self.limiters[index].reserve(tokens))
+            try:
+                message = self._generate_with(index, messages, stop, **kwargs)
+                self.limiters[index].settle(tokens, self._usage(message))
+                return ChatResult(generations=[ChatGeneration(message=message)])
+            except Exception as e:
+                delay = self._on_error(e, index, attempt)
+                attempt += 1
+                time.sleep(delay)
+
 
 class LLMFactory:
+    @staticmethod
+    def _chat_model(model_name: str, http_client=None, http_async_client=None):
+        from langchain_groq import ChatGroq
+
+        options = {}
+        if Config.GROQ_BASE_URL:
+            options["base_url"] = Config.GROQ_BASE_URL
+        return ChatGroq(
+            groq_api_key=Config.GROQ_API_KEY,
+            model_name=model_name,
+            temperature=0.1,
+            # Retries are the gateway's job; the SDK's own would bypass the rate limiter.
+            max_retries=0 if Config.LLM_GATEWAY_ENABLED else 2,
+            # Passed per request by the SDK, so it overrides the pool's own timeout.
+            request_timeout=Config.LLM_TIMEOUT,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            **options
+        )
+
     @staticmethod
     def get_llm():
         if not Config.GROQ_API_KEY:
             return None
-        return ChatGroq(
-            groq_api_key=Config.GROQ_API_KEY,
-            model_name=Config.MODEL_NAME,
-            temperature=0.1
+        if not Config.LLM_GATEWAY_ENABLED:
+            return LLMFactory._chat_model(Config.MODEL_NAME)
+
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=Config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.LLM_MAX_CONNECTIONS
+        )
+        timeout = httpx.Timeout(Config.LLM_TIMEOUT)
+        # One pool per process, shared by every model the gateway routes to.
+        http_client = httpx.Client(limits=limits, timeout=timeout)
+        http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        names = [Config.MODEL_NAME] + ([Config.FALLBACK_MODEL_NAME] if Config.FALLBACK_MODEL_NAME else [])
+        return LLMGateway(
+            models=[LLMFactory._chat_model(n, http_client, http_async_client) for n in names],
+            limiters=[
+                RateLimiter(Config.LLM_REQUESTS_PER_MINUTE, Config.LLM_TOKENS_PER_MINUTE, Config.LLM_RATE_BURST),
+                RateLimiter(Config.FALLBACK_REQUESTS_PER_MINUTE, Config.FALLBACK_TOKENS_PER_MINUTE, Config.LLM_RATE_BURST),
+            ][:len(names)],
+            max_retries=Config.LLM_MAX_RETRIES,
+            backoff_base=Config.LLM_BACKOFF_BASE,
+            max_queue_wait=Config.LLM_MAX_QUEUE_WAIT,
+            coalesce=Config.LLM_COALESCE
         )
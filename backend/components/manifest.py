@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SourceManifest:
+    """Chunk ids per source plus a catalog row per ingested document."""
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS chunks (source TEXT, chunk_id TEXT, PRIMARY KEY (source, chunk_id))")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "source TEXT PRIMARY KEY, pages INTEGER, chunks INTEGER, ingested_at REAL, updated_at REAL)"
+        )
+        # Manifests written before the catalog existed still know every source's chunks.
+        self._db.execute(
+            "INSERT OR IGNORE INTO documents (source, pages, chunks, ingested_at, updated_at) "
+            "SELECT source, NULL, COUNT(*), NULL, NULL FROM chunks GROUP BY source"
+        )
+        self._db.commit()
+
+    def has_source(self, source: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM chunks WHERE source = ? LIMIT 1", (source,)).fetchone()
+        return row is not None
+
+    def chunk_ids(self, source: str) -> set:
+        with self._lock:
+            rows = self._db.execute("SELECT chunk_id FROM chunks WHERE source = ?", (source,)).fetchall()
+        return {r[0] for r in rows}
+
+    def replace(self, source: str, chunk_ids, pages: int = None):
+        chunk_ids = set(chunk_ids)
+        now = time.time()
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO chunks (source, chunk_id) VALUES (?, ?)",
+                [(source, cid) for cid in chunk_ids]
+            )
+            if chunk_ids:
+                self._db.execute(
+                    "INSERT INTO documents (source, pages, chunks, ingested_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(source) DO UPDATE SET pages = COALESCE(excluded.pages, pages), "
+                    "chunks = excluded.chunks, updated_at = excluded.updated_at",
+                    (source, pages, len(chunk_ids), now, now)
+                )
+            else:
+                self._db.execute("DELETE FROM documents WHERE source = ?", (source,))
+            self._db.commit()
+
+    def documents(self) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, pages, chunks, ingested_at, updated_at FROM documents ORDER BY source"
+            ).fetchall()
+        return [
+            {"source": source, "pages": pages, "chunks": chunks, "ingested_at": ingested_at, "updated_at": updated_at}
+            for source, pages, chunks, ingested_at, updated_at in rows
+        ]
+
+    def sources(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT source FROM documents ORDER BY source").fetchall()]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM documents")
+            self._db.commit()
@@ -0,0 +1,195 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 10, 15, 20)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                for bound, c in list(zip(self.buckets, counts)) + [("+Inf", count)]:
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {c}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class RequestTrace:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.outcome = None
+        self.started = time.perf_counter()
+        self.nodes = {}
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retrieval_hits = 0
+        self.steps = 0
+        self.retries = 0
+
+    def record_node(self, node: str, seconds: float):
+        calls, total = self.nodes.get(node, (0, 0.0))
+        self.nodes[node] = (calls + 1, total + seconds)
+
+    def summary(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "nodes": {n: {"calls": c, "ms": round(t * 1000, 2)} for n, (c, t) in self.nodes.items()},
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "retrieval_hits": self.retrieval_hits,
+            "steps": self.steps,
+            "retries": self.retries,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests = Counter("rag_requests_total", "RAGService requests by entry point and outcome.", ("endpoint", "outcome"))
+        self.request_duration = Histogram("rag_request_duration_seconds", "RAGService request wall time.", ("endpoint",))
+        self.node_duration = Histogram("rag_node_duration_seconds", "RAG graph node wall time.", ("node",))
+        self.llm_calls = Counter("rag_llm_calls_total", "LLM calls by graph node.", ("node",))
+        self.llm_tokens = Counter("rag_llm_tokens_total", "LLM tokens by graph node and kind.", ("node", "kind"))
+        self.retrieval_hits = Histogram("rag_retrieval_hits", "Chunks returned per document search.", buckets=COUNT_BUCKETS)
+        self.steps = Histogram("rag_agent_steps", "ReAct agent steps per request.", buckets=COUNT_BUCKETS)
+        self.retries = Histogram("rag_validation_retries", "Validation retries per request.", buckets=COUNT_BUCKETS)
+        self.validations = Counter(
+            "rag_validation_decisions_total",
+            "Answer validations by deciding tier (local checks avoid an LLM call) and verdict.",
+            ("tier", "verdict")
+        )
+        self.validation_llm_calls = Counter(
+            "rag_validation_llm_calls_total",
+            "Answer validations that called the LLM judge (made) or were decided locally instead (avoided).",
+            ("outcome",)
+        )
+        self.validation_local_accepts = Counter(
+            "rag_validation_local_accepts_total", "Answers accepted by the local grounding check without the LLM judge."
+        )
+        self.llm_gateway = Counter(
+            "rag_llm_gateway_events_total", "LLM gateway retries, rate limits, fallbacks and coalesced calls.", ("event",)
+        )
+        self.retrieval_reuse = Counter(
+            "rag_retrieval_reused_total", "Document searches served from an identical search in the same batch."
+        )
+        self._current = ContextVar("rag_request_trace", default=None)
+
+    @property
+    def trace(self):
+        return self._current.get()
+
+    @contextmanager
+    def request(self, endpoint: str):
+        trace = RequestTrace(endpoint)
+        token = self._current.set(trace)
+        outcome = "ok"
+        try:
+            yield trace
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self._current.reset(token)
+            self.request_duration.observe(time.perf_counter() - trace.started, endpoint=endpoint)
+            self.requests.inc(endpoint=endpoint, outcome=trace.outcome or outcome)
+            if trace.steps:
+                self.steps.observe(trace.steps)
+                self.retries.observe(trace.retries)
+
+    def record_node(self, node: str, seconds: float):
+        self.node_duration.observe(seconds, node=node)
+        trace = self.trace
+        if trace:
+            trace.record_node(node, seconds)
+
+    def record_llm(self, node: str, message):
+        usage = getattr(message, "usage_metadata", None) or {}
+        if not usage:
+            token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+            usage = {"input_tokens": token_usage.get("prompt_tokens", 0), "output_tokens": token_usage.get("completion_tokens", 0)}
+        prompt, completion = usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+
+        self.llm_calls.inc(node=node)
+        self.llm_tokens.inc(prompt, node=node, kind="prompt")
+        self.llm_tokens.inc(completion, node=node, kind="completion")
+        trace = self.trace
+        if trace:
+            trace.llm_calls += 1
+            trace.prompt_tokens += prompt
+            trace.completion_tokens += completion
+
+    def record_retrieval(self, hits: int):
+        self.retrieval_hits.observe(hits)
+        trace = self.trace
+        if trace:
+            trace.retrieval_hits += hits
+
+    def record_validation(self, tier: str, is_valid: bool):
+        self.validations.inc(tier=tier, verdict="valid" if is_valid else "invalid")
+        self.validation_llm_calls.inc(outcome="made" if tier == "llm" else "avoided")
+        if tier == "local" and is_valid:
+            self.validation_local_accepts.inc()
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.requests, self.request_duration, self.node_duration, self.llm_calls,
+                       self.llm_tokens, self.retrieval_hits, self.steps, self.retries, self.validations,
+                       self.validation_llm_calls, self.validation_local_accepts, self.llm_gateway,
+                       self.retrieval_reuse):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,267 @@
+import os
+import pickle
+import threading
+import uuid
+from typing import Iterable, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from .filters import match_where
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process cosine-similarity index over a float32 matrix.
+
+    ``index="flat"`` scores every row; ``index="ivf"`` clusters rows with
+    k-means once the collection is large enough and only scores the
+    ``nprobe`` closest clusters. Persisted as ``vectors.npy`` (memory-mapped on
+    load) plus a pickle with ids, texts and metadata.
+    """
+
+    def __init__(self, embedding: Embeddings, path: str = None, index: str = "flat",
+                 nlist: int = 0, nprobe: int = 8, ivf_min_rows: int = 4096):
+        if index not in ("flat", "ivf"):
+            raise ValueError(f"Unknown index type: {index}")
+        self._embedding = embedding
+        self.path = path
+        self.index = index
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._pending = []
+        self._ids = []
+        self._texts = []
+        self._metadatas = []
+        self._alive = []
+        self._rows = {}
+        self._mask = None
+        self._centroids = None
+        self._lists = None
+        self._assigned = 0
+        self._trained_rows = 0
+        self._dirty = False
+        if path:
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _load(self):
+        vectors_path = os.path.join(self.path, "vectors.npy")
+        meta_path = os.path.join(self.path, "meta.pkl")
+        if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+            return
+        try:
+            with open(meta_path, "rb") as f:
+                data = pickle.load(f)
+            self._matrix = np.load(vectors_path, mmap_mode="r")
+            self._ids = data["ids"]
+            self._texts = data["texts"]
+            self._metadatas = data["metadatas"]
+            self._alive = [True] * len(self._ids)
+            self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        except Exception as e:
+            print(f"Failed to load vector index from {self.path}: {e}")
+
+    def persist(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._consolidate(compact=True)
+            os.makedirs(self.path, exist_ok=True)
+            vectors_path = os.path.join(self.path, "vectors.npy")
+            meta_path = os.path.join(self.path, "meta.pkl")
+            with open(f"{vectors_path}.tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(self._matrix))
+            with open(f"{meta_path}.tmp", "wb") as f:
+                pickle.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{vectors_path}.tmp", vectors_path)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            self._dirty = False
+
+    def _consolidate(self, compact: bool = False):
+        # Appends are buffered and stacked once here, so ingest stays linear.
+        if self._pending:
+            parts = ([self._matrix] if len(self._matrix) else []) + self._pending
+            self._matrix = np.vstack(parts)
+            self._pending = []
+        dead = len(self._ids) - len(self._rows)
+        if dead and (compact or dead > len(self._ids) // 4):
+            keep = [row for row, alive in enumerate(self._alive) if alive]
+            self._matrix = np.asarray(self._matrix[keep])
+            self._ids = [self._ids[row] for row in keep]
+            self._texts = [self._texts[row] for row in keep]
+            self._metadatas = [self._metadatas[row] for row in keep]
+            self._alive = [True] * len(keep)
+            self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+            self._mask = None
+            self._centroids = None
+        if self._mask is None or len(self._mask) != len(self._alive):
+            self._mask = np.asarray(self._alive, dtype=bool)
+        if self.index == "ivf":
+            self._maybe_train()
+
+    def _maybe_train(self):
+        rows = len(self._ids)
+        if rows < self.ivf_min_rows:
+            self._centroids = None
+            return
+        if self._centroids is not None and rows < 2 * self._trained_rows:
+            if self._assigned < rows:
+                self._extend_lists(self._assigned, rows)
+            return
+        nlist = self.nlist or max(1, int(np.sqrt(rows)))
+        data = np.asarray(self._matrix)
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(rows, size=min(rows, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(10):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._assigned = 0
+        self._extend_lists(0, rows)
+        self._trained_rows = rows
+
+    def _extend_lists(self, start: int, stop: int):
+        labels = np.argmax(np.asarray(self._matrix[start:stop]) @ self._centroids.T, axis=1)
+        rows = np.arange(start, stop)
+        for c in np.unique(labels):
+            self._lists[c] = np.concatenate([self._lists[c], rows[labels == c]])
+        self._assigned = stop
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        if not texts:
+            return []
+        vectors = _normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+        with self._lock:
+            self._delete_locked(ids)
+            start = len(self._ids)
+            self._pending.append(vectors)
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(dict(m or {}) for m in metadatas)
+            self._alive.extend([True] * len(ids))
+            for offset, chunk_id in enumerate(ids):
+                self._rows[chunk_id] = start + offset
+            self._dirty = True
+        return ids
+
+    def _delete_locked(self, ids: List[str]):
+        for chunk_id in ids:
+            row = self._rows.pop(chunk_id, None)
+            if row is not None:
+                self._alive[row] = False
+                if self._mask is not None and row < len(self._mask):
+                    self._mask[row] = False
+                self._dirty = True
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> Optional[bool]:
+        with self._lock:
+            self._delete_locked(ids or [])
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._pending = []
+            self._ids, self._texts, self._metadatas, self._alive = [], [], [], []
+            self._rows = {}
+            self._mask = None
+            self._centroids = None
+            self._lists = None
+            self._assigned = 0
+            self._trained_rows = 0
+            self._dirty = True
+        self.persist()
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[dict] = None,
+            include: Optional[List[str]] = None, **kwargs) -> dict:
+        include = ["documents", "metadatas"] if include is None else include
+        with self._lock:
+            if "embeddings" in include:
+                self._consolidate()
+            rows = [self._rows[i] for i in ids if i in self._rows] if ids is not None else sorted(self._rows.values())
+            rows = [r for r in rows if match_where(self._metadatas[r], where)]
+            return {
+                "ids": [self._ids[r] for r in rows],
+                "documents": [self._texts[r] for r in rows] if "documents" in include else None,
+                "metadatas": [self._metadatas[r] for r in rows] if "metadatas" in include else None,
+                "embeddings": np.asarray(self._matrix[rows]) if "embeddings" in include else None,
+            }
+
+    def _candidate_rows(self, query: np.ndarray, where: Optional[dict]) -> Optional[np.ndarray]:
+        if where:
+            return np.array([r for r in self._rows.values() if match_where(self._metadatas[r], where)], dtype=np.int64)
+        if self._centroids is None:
+            return None
+        probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        return np.concatenate([self._lists[c] for c in probes])
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[dict] = None, **kwargs) -> List[tuple]:
+        query = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+        with self._lock:
+            self._consolidate()
+            if not self._rows:
+                return []
+            candidates = self._candidate_rows(query, filter)
+            matrix = self._matrix if candidates is None else self._matrix[candidates]
+            scores = np.asarray(matrix @ query)
+            scores[~(self._mask if candidates is None else self._mask[candidates])] = -np.inf
+            k = min(k, int(np.isfinite(scores).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            rows = top if candidates is None else candidates[top]
+            return [
+                (Document(id=self._ids[r], page_content=self._texts[r], metadata=dict(self._metadatas[r])), float(scores[t]))
+                for r, t in zip(rows, top)
+            ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs) -> List[tuple]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs) -> List[Document]:
+        return [d for d, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs) -> List[Document]:
+        return [d for d, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, **kwargs) -> "NumpyVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
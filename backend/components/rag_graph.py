@@ -1,40 +1,168 @@
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from .state import AgentState
+from .state import AgentState, NewTurn
+from langgraph.checkpoint.memory import MemorySaver
+from .conversations import ConversationStore, client_turns, history_from_client, window_history
 from .config import Config
+from .metrics import METRICS
+from .validators import build_validator, format_chunks
+from .filters import combine_where, where_sources
+from .reranking import MMRReranker, build_reranker, estimate_tokens, pack_context, stored_embeddings
+import asyncio
+import functools
+import hashlib
+import json
 import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+ACTION_RE = re.compile(
+    r'ACTION:\s*search_documents\(\s*[\'"](.*?)[\'"]\s*(?:,\s*(?:source\s*=\s*)?[\'"](.*?)[\'"]\s*)?\)',
+    re.IGNORECASE
+)
+
+# Set by shared_retrieval(); maps (query, where) to the retrieval task every caller awaits.
+_RETRIEVAL_MEMO = ContextVar("rag_retrieval_memo", default=None)
+
+
+@contextmanager
+def shared_retrieval():
+    """Let runs started inside this block reuse each other's identical searches."""
+    token = _RETRIEVAL_MEMO.set({})
+    try:
+        yield
+    finally:
+        _RETRIEVAL_MEMO.reset(token)
+
 
 class RAGGraph:
-    def __init__(self, llm, vector_store):
+    def __init__(self, llm, vector_store, lexical_index=None, validator=None, checkpointer=None, catalog=None,
+                 reranker=None):
         self.llm = llm
         self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.catalog = catalog
+        self.reranker = reranker if reranker is not None else build_reranker(vector_store.embeddings)
+        self.validator = validator or build_validator(llm)
+        self.conversations = ConversationStore(
+            # Persistent stores are opened on the event loop (open_checkpointer) and passed in.
+            checkpointer if checkpointer is not None else MemorySaver(),
+            ttl=Config.CONVERSATION_TTL
+        )
         self.graph = self._build_graph()
 
-    def _retrieve_docs(self, query: str):
-        try:
-            retriever = self.vector_store.as_retriever(search_kwargs={"k": 20})
-            docs = retriever.invoke(query)
-            
-            grouped_docs = {}
-            for d in docs:
-                source = d.metadata.get("source") or d.metadata.get("doc_name") or "Unknown"
-                if source not in grouped_docs:
-                    grouped_docs[source] = []
-                grouped_docs[source].append(d)
-                
-            selected_docs = []
-            max_docs_per_source = max(len(v) for v in grouped_docs.values()) if grouped_docs else 0
+    @staticmethod
+    def _doc_key(d):
+        return d.metadata.get("chunk_id") or d.page_content
+
+    def _fuse(self, ranked_lists: list, with_scores: bool = False) -> list:
+        scores = {}
+        docs = {}
+        for ranked in ranked_lists:
+            for rank, d in enumerate(ranked):
+                key = self._doc_key(d)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (Config.RRF_K + rank + 1)
+                docs.setdefault(key, d)
+        ordered = sorted(scores, key=scores.get, reverse=True)
+        if with_scores:
+            return [(docs[key], scores[key]) for key in ordered]
+        return [docs[key] for key in ordered]
+
+    @property
+    def _hybrid(self) -> bool:
+        return self.lexical_index is not None and len(self.lexical_index) > 0
+
+    async def _embed_query(self, query: str):
+        return await asyncio.to_thread(self.vector_store.embeddings.embed_query, query)
+
+    async def _search(self, query: str, k: int = 20, where: dict = None, with_scores: bool = False,
+                      query_vector=None):
+        if query_vector is None:
+            query_vector = await self._embed_query(query)
+        search_kwargs = {"k": k}
+        if where:
+            search_kwargs["filter"] = where
+        vector_search = asyncio.to_thread(self.vector_store.similarity_search_by_vector, query_vector, **search_kwargs)
+        lexical_hits = []
+        if not self._hybrid:
+            ranked_lists = [await vector_search]
+        else:
+            vector_docs, lexical_hits = await asyncio.gather(
+                vector_search,
+                asyncio.to_thread(self.lexical_index.search, query, k, where)
+            )
+            ranked_lists = [vector_docs, [d for d, _ in lexical_hits]]
+        fused = self._fuse(ranked_lists, with_scores=with_scores)
+        if with_scores and fused and lexical_hits:
+            # RRF only keeps ranks; fold BM25 magnitude back in so a decisive keyword match stands out.
+            top = lexical_hits[0][1] or 1.0
+            lexical = {self._doc_key(d): score / top for d, score in lexical_hits}
+            best = fused[0][1]
+            fused = [(d, 0.5 * score / best + 0.5 * lexical.get(self._doc_key(d), 0.0)) for d, score in fused]
+        return fused
+
+    @staticmethod
+    def _interleave_by_source(docs: list) -> list:
+        grouped_docs = {}
+        for d in docs:
+            source = d.metadata.get("source") or d.metadata.get("doc_name") or "Unknown"
+            if source not in grouped_docs:
+                grouped_docs[source] = []
+            grouped_docs[source].append(d)
             
-            for i in range(max_docs_per_source):
-                for source in grouped_docs:
-                    if i < len(grouped_docs[source]):
-                        selected_docs.append(grouped_docs[source][i])
-                        
-            selected_docs = selected_docs[:5]
+        selected_docs = []
+        max_docs_per_source = max(len(v) for v in grouped_docs.values()) if grouped_docs else 0
+        
+        for i in range(max_docs_per_source):
+            for source in grouped_docs:
+                if i < len(grouped_docs[source]):
+                    selected_docs.append(grouped_docs[source][i])
+        return selected_docs
+
+    async def _select_docs(self, query: str, candidates: list, query_vector=None) -> list:
+        docs = [d for d, _ in candidates]
+        if self.reranker is None:
+            return self._interleave_by_source(docs)[:5]
+        if isinstance(self.reranker, MMRReranker) and not self._hybrid:
+            # Without a lexical prior MMR only re-sorts by the same embeddings the search used, and on
+            # the fixtures it cost more tokens than the plain ordering; keep that ordering, packed.
+            scores = {id(d): score for d, score in candidates}
+            return pack_context(
+                [(d, scores[id(d)]) for d in self._interleave_by_source(docs)],
+                Config.CONTEXT_TOKEN_BUDGET, Config.CONTEXT_MAX_CHUNKS, Config.RERANK_MIN_RELATIVE_SCORE
+            )
+        # The fusion score carries the lexical signal that embedding similarity alone misses.
+        prior = [score for _, score in candidates]
+        doc_vectors = await asyncio.to_thread(
+            stored_embeddings, self.vector_store, [d.metadata.get("chunk_id") or d.id for d in docs]
+        )
+        scored = await asyncio.to_thread(self.reranker.rerank, query, docs, prior, query_vector, doc_vectors)
+        return pack_context(
+            scored, Config.CONTEXT_TOKEN_BUDGET, Config.CONTEXT_MAX_CHUNKS, Config.RERANK_MIN_RELATIVE_SCORE
+        )
+
+    async def _retrieve_docs(self, query: str, where: dict = None):
+        memo = _RETRIEVAL_MEMO.get()
+        if memo is None:
+            return await self._run_retrieval(query, where)
+        key = (" ".join(query.lower().split()), json.dumps(where, sort_keys=True, default=str))
+        task = memo.get(key)
+        if task is None:
+            task = memo[key] = asyncio.ensure_future(self._run_retrieval(query, where))
+        else:
+            METRICS.retrieval_reuse.inc()
+        # Shielded so one run being cancelled does not cancel the search for the others.
+        return await asyncio.shield(task)
+
+    async def _run_retrieval(self, query: str, where: dict = None):
+        try:
+            query_vector = await self._embed_query(query)
+            candidates = await self._search(query, k=20, where=where, with_scores=True, query_vector=query_vector)
+            selected_docs = await self._select_docs(query, candidates, query_vector)
 
             sources = []
             unique_contents = set()
-            context = ""
             
             for d in selected_docs:
                 txt = d.page_content.strip()
@@ -52,59 +180,171 @@ class RAGGraph:
                     "chunk_index": d.metadata.get("chunk_index")
                 }
                 sources.append(s)
-                context += f"\n[File: {s['filename']}, Page: {s['page']}]\n{txt}\n"
-            return {"context": context, "sources": sources}
+            METRICS.record_retrieval(len(sources))
+            return {"sources": sources}
         except Exception as e:
-            return {"context": "", "sources": []}
+            return {"sources": []}
+
+    def _available_sources(self, where: dict = None) -> list:
+        scoped = where_sources(where)
+        if scoped is not None:
+            return sorted(scoped)
+        if self.catalog is None:
+            return []
+        try:
+            return self.catalog.sources()
+        except Exception:
+            return []
+
+    def _resolve_source(self, name: str, where: dict = None):
+        # Agents often drop extensions or change case; map to a catalogued filename when unambiguous.
+        known = self._available_sources(where)
+        if not known or name in known:
+            return name
+        matches = [s for s in known if name.lower() in s.lower()]
+        return matches[0] if len(matches) == 1 else name
 
-    def _agent(self, state: AgentState):
+    async def _agent(self, state: AgentState):
         messages = list(state["messages"])
         username = state.get("username", "User")
         
         if not any(isinstance(m, SystemMessage) for m in messages):
+            documents = self._available_sources(state.get("where"))
+            catalog = ""
+            if documents:
+                shown = documents[:Config.AGENT_MAX_LISTED_DOCUMENTS]
+                more = len(documents) - len(shown)
+                catalog = "Available documents: " + ", ".join(shown) + (f" (+{more} more)" if more > 0 else "") + "\n"
             messages.insert(0, SystemMessage(content=(
                 f"You are an expert ReAct Agent assisting {username}. To answer, you MUST search documents first. "
                 "Current Strategy: \n"
                 "1. If you need info, output: ACTION: search_documents(\"query\")\n"
+                "   To search a single file, output: ACTION: search_documents(\"query\", source=\"file name\")\n"
+                "   For questions with several parts, output one ACTION line per part in the same reply; "
+                f"up to {Config.MAX_QUERIES_PER_ACTION} searches run together.\n"
                 "2. If you have sufficient info, output: FINAL_ANSWER: your response\n"
+                f"{catalog}"
                 "Constraint: FINAL_ANSWER must be grounded in context."
             )))
-        res = self.llm.invoke(messages)
+
+        messages = self._prompt_messages(messages, state.get("chunks") or {})
+
+        memory = []
+        if state.get("summary"):
+            memory.append(SystemMessage(content=f"Summary of earlier conversation:\n{state['summary']}"))
+        memory.extend(state.get("history") or [])
+        insert_at = 1 if messages and isinstance(messages[0], SystemMessage) else 0
+        messages[insert_at:insert_at] = memory
+
+        res = await self.llm.ainvoke(messages)
+        METRICS.record_llm("agent", res)
         return {"messages": [res], "steps": state.get("steps", 0) + 1}
 
-    def _tool_executor(self, state: AgentState):
+    @staticmethod
+    def _chunk_key(s: dict) -> str:
+        if s.get("chunk_id"):
+            return s["chunk_id"]
+        return hashlib.sha1(f"{s['filename']}\0{s['page']}\0{s['content']}".encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _render_observation(sections: list, chunks: dict, expand=frozenset(), shown: set = None,
+                            omitted: str = "") -> str:
+        # Chunks in ``expand`` are written out at their first reference; later ones point back to it.
+        shown = set() if shown is None else shown
+        parts = []
+        for section in sections:
+            lines = []
+            for chunk_id in section["chunk_ids"]:
+                c = chunks.get(chunk_id)
+                if c is None:
+                    continue
+                label = f"[#{c['ref']} File: {c['filename']}, Page: {c['page']}]"
+                if chunk_id in shown:
+                    lines.append(f"{label} (shown above)")
+                elif chunk_id in expand:
+                    shown.add(chunk_id)
+                    lines.append(f"{label}\n{c['content']}")
+                else:
+                    lines.append(label + omitted)
+            body = "\n".join(lines) or "No relevant documents found."
+            parts.append(f"[Query: {section['query']}]\n{body}" if len(sections) > 1 else body)
+        return "OBSERVATION:\n" + "\n\n".join(parts)
+
+    def _prompt_messages(self, messages: list, chunks: dict) -> list:
+        """Expand observation references into chunk text, each chunk once and within the token budget."""
+        observations = [m.additional_kwargs["observation"] for m in messages
+                        if isinstance(m, AIMessage) and "observation" in m.additional_kwargs]
+        if not observations:
+            return messages
+        expand, used = set(), 0
+        # Newest observations claim the budget first; older evidence is what gets left out.
+        for sections in reversed(observations):
+            for section in sections:
+                for chunk_id in section["chunk_ids"]:
+                    if chunk_id in expand or chunk_id not in chunks:
+                        continue
+                    cost = estimate_tokens(chunks[chunk_id]["content"])
+                    if used + cost <= Config.AGENT_CONTEXT_TOKEN_BUDGET:
+                        expand.add(chunk_id)
+                        used += cost
+        shown = set()
+        prompt = []
+        for m in messages:
+            sections = m.additional_kwargs.get("observation") if isinstance(m, AIMessage) else None
+            if sections is None:
+                prompt.append(m)
+            else:
+                prompt.append(AIMessage(content=self._render_observation(
+                    sections, chunks, expand, shown, " (omitted to fit the context budget)"
+                )))
+        return prompt
+
+    @staticmethod
+    def _sources(state: AgentState) -> list:
+        # "ref" only numbers chunks in the prompt; sources keep the shape the API always returned.
+        chunks = sorted((state.get("chunks") or {}).values(), key=lambda c: c["ref"])
+        return [{k: v for k, v in c.items() if k != "ref"} for c in chunks]
+
+    async def _tool_executor(self, state: AgentState):
         if state.get("steps", 0) > 10: 
              return {"messages": [SystemMessage(content="Limit reached. Output FINAL_ANSWER now.")]}
              
         last_msg = state["messages"][-1].content
-        match = re.search(r'ACTION:\s*search_documents\([\'"](.*?)[\'"]\)', last_msg, re.IGNORECASE)
+        requests = []
+        for match in ACTION_RE.finditer(last_msg):
+            where = state.get("where")
+            if match.group(2):
+                where = combine_where(where, {"source": self._resolve_source(match.group(2), where)})
+            if (match.group(1), where) not in requests:
+                requests.append((match.group(1), where))
+        requests = requests[:Config.MAX_QUERIES_PER_ACTION]
         
-        if match:
-            q = match.group(1)
-            res = self._retrieve_docs(q)
-            obs_content = f"OBSERVATION: {res['context']}" if res['context'] else "OBSERVATION: No relevant documents found."
-            
-            obs = AIMessage(content=obs_content)
-            
-            current_sources = state.get("sources", [])
-            seen = set((s['filename'], s['page'], s['content']) for s in current_sources)
-            new_sources = list(current_sources)
-            
-            for s in res["sources"]:
-                key = (s['filename'], s['page'], s['content'])
-                if key not in seen:
-                    seen.add(key)
-                    new_sources.append(s)
+        if requests:
+            results = await asyncio.gather(*(self._retrieve_docs(q, where) for q, where in requests))
 
-            return {
-                "messages": [obs],
-                "context": (state.get("context", "") + "\n" + obs_content).strip(),
-                "sources": new_sources
-            }
+            # Chunks are stored once per run; observations only hold their ids and are expanded
+            # into text when the next prompt is built.
+            chunks = dict(state.get("chunks") or {})
+            sections = []
+            for (q, _), res in zip(requests, results):
+                ids = []
+                for s in res["sources"]:
+                    chunk_id = self._chunk_key(s)
+                    if chunk_id not in chunks:
+                        chunks[chunk_id] = {**s, "ref": len(chunks) + 1}
+                    if chunk_id not in ids:
+                        ids.append(chunk_id)
+                sections.append({"query": q, "chunk_ids": ids})
+
+            obs = AIMessage(
+                content=self._render_observation(sections, chunks),
+                additional_kwargs={"observation": sections}
+            )
+            return {"messages": [obs], "chunks": chunks}
         
         return {"messages": [AIMessage(content="OBSERVATION: Invalid format. Use ACTION: search_documents(\"query\")")]}
 
-    def _validator(self, state: AgentState):
+    async def _validator(self, state: AgentState):
         ans = state["messages"][-1].content
         
         clean_ans = None
@@ -115,17 +355,16 @@ class RAGGraph:
             clean_ans = ans.strip()
 
         if clean_ans:
-            v_prompt = f"Context: {state['context']}\nResponse: {clean_ans}\nReply 'VALID' or 'INVALID' only."
+            sources = self._sources(state)
             try:
-                v_res = self.llm.invoke([HumanMessage(content=v_prompt)])
-                is_valid = "VALID" in v_res.content.upper()
+                is_valid = await self.validator.avalidate(clean_ans, sources, format_chunks(sources))
             except:
                 is_valid = True
             
             return {
                 "is_valid": is_valid, 
                 "response": clean_ans, 
-                "sources": state.get("sources", []), 
+                "sources": sources, 
                 "retry_count": state.get("retry_count", 0) + (0 if is_valid else 1)
             }
         
@@ -141,44 +380,95 @@ class RAGGraph:
         if state.get("steps", 0) > 5: return "validate"
         return "validate" 
 
+    async def _remember(self, state: AgentState):
+        if state.get("is_valid"):
+            answer = state.get("response") or ""
+        else:
+            answer = "There is no relevant information in the given data."
+        history = list(state.get("history") or []) + [HumanMessage(content=state["query"]), AIMessage(content=answer)]
+        history, summary = window_history(
+            history, state.get("summary", ""), Config.HISTORY_WINDOW_TURNS, Config.HISTORY_SUMMARY_CHARS
+        )
+        return {"history": history, "summary": summary}
+
     def _retry_logic(self, state: AgentState):
         if state.get("is_valid") or state.get("retry_count", 0) >= Config.ITERATION_COUNT: 
             return "end"
         return "agent"
 
+    @staticmethod
+    def _instrument(name: str, node):
+        @functools.wraps(node)
+        async def wrapper(state: AgentState):
+            start = time.perf_counter()
+            try:
+                return await node(state)
+            finally:
+                METRICS.record_node(name, time.perf_counter() - start)
+        return wrapper
+
     def _build_graph(self):
         workflow = StateGraph(AgentState)
-        workflow.add_node("agent", self._agent)
-        workflow.add_node("action", self._tool_executor)
-        workflow.add_node("validate", self._validator)
+        workflow.add_node("agent", self._instrument("agent", self._agent))
+        workflow.add_node("action", self._instrument("action", self._tool_executor))
+        workflow.add_node("validate", self._instrument("validate", self._validator))
+        workflow.add_node("remember", self._instrument("remember", self._remember))
         workflow.set_entry_point("agent")
         workflow.add_conditional_edges("agent", self._router, {"action": "action", "validate": "validate"})
         workflow.add_edge("action", "agent")
-        workflow.add_conditional_edges("validate", self._retry_logic, {"agent": "agent", "end": END})
-        return workflow.compile()
+        workflow.add_conditional_edges("validate", self._retry_logic, {"agent": "agent", "end": "remember"})
+        workflow.add_edge("remember", END)
+        return workflow.compile(checkpointer=self.conversations.checkpointer)
  
-    def run(self, query: str, chat_history: list, username: str = "User", thread_id: str = "default"):
-        msgs = []
-        for m in chat_history:
-            if m.get("role") == "user": msgs.append(HumanMessage(content=m["content"]))
-            elif m.get("role") == "assistant": msgs.append(AIMessage(content=m["content"]))
-        msgs.append(HumanMessage(content=query))
-        
-        init = {
-            "query": query, "messages": msgs, "context": "", "response": "", 
-            "is_valid": False, "retry_count": 0, "sources": [], "username": username, "steps": 0
-        }
-        return self.graph.invoke(init)
-
-    def run_stream(self, query: str, chat_history: list, username: str = "User", thread_id: str = "default"):
-        msgs = []
-        for m in chat_history:
-            if m.get("role") == "user": msgs.append(HumanMessage(content=m["content"]))
-            elif m.get("role") == "assistant": msgs.append(AIMessage(content=m["content"]))
-        msgs.append(HumanMessage(content=query))
-        
+    @staticmethod
+    def _thread_config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def ahas_history(self, thread_id: str) -> bool:
+        snapshot = await self.graph.aget_state(self._thread_config(thread_id))
+        values = snapshot.values or {}
+        return bool(values.get("history") or values.get("summary"))
+
+    async def _initial_state(self, query: str, chat_history: list, username: str, thread_id: str, where: dict = None):
+        await self.conversations.atouch(thread_id)
+        await self.conversations.evict_idle()
+
         init = {
-            "query": query, "messages": msgs, "context": "", "response": "", 
-            "is_valid": False, "retry_count": 0, "sources": [], "username": username, "steps": 0
+            "query": query, "messages": NewTurn([HumanMessage(content=query)]), "chunks": {}, "response": "", 
+            "is_valid": False, "retry_count": 0, "sources": [], "username": username, "steps": 0, "where": where
         }
-        return self.graph.stream(init)
+        # Client-supplied history only seeds conversations the server has not seen yet.
+        if client_turns(chat_history) and not await self.ahas_history(thread_id):
+            init["history"], init["summary"] = window_history(
+                history_from_client(chat_history), "", Config.HISTORY_WINDOW_TURNS, Config.HISTORY_SUMMARY_CHARS
+            )
+        return init
+
+    async def aforget(self, thread_id: str):
+        await self.conversations.aforget(thread_id)
+
+    async def aremember(self, thread_id: str, query: str, response: str):
+        config = self._thread_config(thread_id)
+        snapshot = await self.graph.aget_state(config)
+        values = snapshot.values or {}
+        history = list(values.get("history") or []) + [HumanMessage(content=query), AIMessage(content=response)]
+        history, summary = window_history(
+            history, values.get("summary", ""), Config.HISTORY_WINDOW_TURNS, Config.HISTORY_SUMMARY_CHARS
+        )
+        await self.conversations.atouch(thread_id)
+        await self.graph.aupdate_state(config, {"history": history, "summary": summary}, as_node="remember")
+
+    async def arun(self, query: str, chat_history: list, username: str = "User", thread_id: str = "default",
+                   where: dict = None):
+        init = await self._initial_state(query, chat_history, username, thread_id, where)
+        return await self.graph.ainvoke(init, config=self._thread_config(thread_id))
+
+    async def arun_stream(self, query: str, chat_history: list, username: str = "User", thread_id: str = "default",
+                          where: dict = None):
+        init = await self._initial_state(query, chat_history, username, thread_id, where)
+        async for event in self.graph.astream(init, config=self._thread_config(thread_id), stream_mode=["updates", "messages"]):
+            yield event
+
+    def run(self, query: str, chat_history: list, username: str = "User", thread_id: str = "default",
+            where: dict = None):
+        return asyncio.run(self.arun(query, chat_history, username=username, thread_id=thread_id, where=where))
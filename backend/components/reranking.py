@@ -0,0 +1,137 @@
+import math
+from typing import List, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from .config import Config
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; close enough for budgeting.
+    return max(1, len(text) // 4)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def stored_embeddings(vector_store, ids: List[str]):
+    """The vectors ``vector_store`` already holds for ``ids``, in order; None unless it has all of them."""
+    store = getattr(vector_store, "store", None)
+    if isinstance(store, dict):
+        # langchain's InMemoryVectorStore
+        vectors = [(store.get(i) or {}).get("vector") for i in ids]
+    else:
+        try:
+            data = vector_store.get(ids=list(dict.fromkeys(ids)), include=["embeddings"])
+        except Exception:
+            return None
+        embeddings = data.get("embeddings")
+        if embeddings is None:
+            return None
+        found = dict(zip(data["ids"], embeddings))
+        vectors = [found.get(i) for i in ids]
+    if any(v is None for v in vectors):
+        return None
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class MMRReranker:
+    """Maximal marginal relevance over chunk embeddings.
+
+    Callers pass the query vector they searched with and the chunk vectors
+    the store already holds; only what is missing gets embedded. Relevance
+    blends query similarity with the retriever's own score (``prior``),
+    scaled to the best candidate.
+    """
+
+    def __init__(self, embeddings, lambda_mult: float = 0.7, prior_weight: float = 0.5):
+        self.embeddings = embeddings
+        self.lambda_mult = lambda_mult
+        self.prior_weight = prior_weight
+
+    def rerank(self, query: str, docs: List[Document], prior: List[float] = None, query_vector=None,
+               doc_vectors=None) -> List[Tuple[Document, float]]:
+        if not docs:
+            return []
+        if query_vector is None:
+            query_vector = self.embeddings.embed_query(query)
+        if doc_vectors is None:
+            doc_vectors = self.embeddings.embed_documents([d.page_content for d in docs])
+        query_vec = _normalize(np.asarray(query_vector, dtype=np.float32))
+        doc_vecs = _normalize(np.asarray(doc_vectors, dtype=np.float32))
+        relevance = doc_vecs @ query_vec
+        if prior is not None and self.prior_weight:
+            prior = np.asarray(prior, dtype=np.float32)
+            prior = prior / (prior.max() or 1.0)
+            relevance = (1 - self.prior_weight) * relevance + self.prior_weight * prior
+
+        selected = []
+        redundancy = np.full(len(docs), -np.inf)
+        remaining = np.ones(len(docs), dtype=bool)
+        while remaining.any():
+            diversity = np.where(np.isfinite(redundancy), redundancy, 0.0)
+            mmr = self.lambda_mult * relevance - (1 - self.lambda_mult) * diversity
+            mmr[~remaining] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            remaining[best] = False
+            redundancy = np.maximum(redundancy, doc_vecs @ doc_vecs[best])
+        return [(docs[i], float(relevance[i])) for i in selected]
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder (sentence-transformers); scores squashed to 0..1."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "RERANKER=cross_encoder requires sentence-transformers: pip install sentence-transformers"
+            ) from e
+        self.model = CrossEncoder(model_name)
+
+    def rerank(self, query: str, docs: List[Document], prior: List[float] = None, query_vector=None,
+               doc_vectors=None) -> List[Tuple[Document, float]]:
+        if not docs:
+            return []
+        logits = self.model.predict([(query, d.page_content) for d in docs])
+        scored = [(d, 1 / (1 + math.exp(-float(s)))) for d, s in zip(docs, logits)]
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+
+def build_reranker(embeddings, kind: str = None):
+    kind = kind or Config.RERANKER
+    if kind == "none":
+        return None
+    if kind == "mmr":
+        return MMRReranker(embeddings, lambda_mult=Config.RERANK_MMR_LAMBDA, prior_weight=Config.RERANK_PRIOR_WEIGHT)
+    if kind == "cross_encoder":
+        return CrossEncoderReranker(Config.CROSS_ENCODER_MODEL)
+    raise ValueError(f"Unknown reranker: {kind}")
+
+
+def pack_context(scored: List[Tuple[Document, float]], budget_tokens: int, max_chunks: int,
+                 min_relative_score: float = 0.0) -> List[Document]:
+    """Take reranked chunks in order while they fit the token budget.
+
+    The first chunk is always kept; later ones are dropped when they score
+    below ``min_relative_score`` of the best chunk, so k adapts to how many
+    chunks are actually relevant.
+    """
+    if not scored:
+        return []
+    top_score = max(score for _, score in scored)
+    floor = top_score * min_relative_score if top_score > 0 else -math.inf
+    packed, used = [], 0
+    for doc, score in scored:
+        if len(packed) >= max_chunks:
+            break
+        cost = estimate_tokens(doc.page_content)
+        if packed and (score < floor or used + cost > budget_tokens):
+            continue
+        packed.append(doc)
+        used += cost
+    return packed
@@ -2,14 +2,27 @@ from typing import List, TypedDict, Optional, Annotated, Sequence
 import operator
 from langchain_core.messages import BaseMessage
 
+class NewTurn(list):
+    pass
+
+def merge_messages(left: Sequence[BaseMessage], right: Sequence[BaseMessage]) -> List[BaseMessage]:
+    # A NewTurn replaces the previous turn's scratchpad instead of appending to it.
+    if isinstance(right, NewTurn):
+        return list(right)
+    return operator.add(list(left or []), list(right or []))
+
 class AgentState(TypedDict):
     query: str
     chat_history: List[dict]
-    context: str
+    chunks: dict
     response: str
     is_valid: bool
     retry_count: int
     sources: List[dict]
     fallback_message: str
-    messages: Annotated[Sequence[BaseMessage], operator.add]
+    messages: Annotated[Sequence[BaseMessage], merge_messages]
     steps: int
+    username: str
+    history: List[BaseMessage]
+    summary: str
+    where: Optional[dict]
@@ -0,0 +1,35 @@
+class FinalAnswerDetector:
+    MARKER = "FINAL_ANSWER:"
+    ACTION = "ACTION:"
+
+    def __init__(self):
+        self.buffer = ""
+        self.mode = None
+        self.emitted_upto = 0
+        self.started = False
+
+    def feed(self, text: str) -> str:
+        if self.mode == "action":
+            return ""
+        self.buffer += text
+
+        if self.mode is None:
+            upper = self.buffer.upper()
+            answer_at = upper.find(self.MARKER)
+            action_at = upper.find(self.ACTION)
+            if answer_at != -1 and (action_at == -1 or answer_at < action_at):
+                self.mode = "answer"
+                self.emitted_upto = answer_at + len(self.MARKER)
+            elif action_at != -1:
+                self.mode = "action"
+                return ""
+            else:
+                return ""
+
+        pending = self.buffer[self.emitted_upto:]
+        self.emitted_upto = len(self.buffer)
+        if not self.started:
+            # Drop the whitespace between the marker and the first answer token.
+            pending = pending.lstrip()
+            self.started = bool(pending)
+        return pending
@@ -0,0 +1,88 @@
+import re
+from langchain_core.messages import HumanMessage
+from .config import Config
+from .lexical_index import tokenize
+from .metrics import METRICS
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def format_chunks(sources: list) -> str:
+    return "\n".join(f"[File: {s['filename']}, Page: {s['page']}]\n{s['content']}" for s in sources)
+
+
+class LexicalGroundingValidator:
+    def __init__(self, min_sentence_tokens: int = 3):
+        self.min_sentence_tokens = min_sentence_tokens
+
+    def _sentences(self, answer: str) -> list:
+        sentences = [set(tokenize(s)) for s in SENTENCE_RE.split(answer)]
+        return [s for s in sentences if len(s) >= self.min_sentence_tokens]
+
+    def score(self, answer: str, sources: list) -> float:
+        sentences = self._sentences(answer)
+        chunks = [set(tokenize(s["content"])) for s in sources]
+        if not sentences:
+            return 1.0 if chunks else 0.0
+        if not chunks:
+            return 0.0
+        support = [max(len(sent & chunk) / len(sent) for chunk in chunks) for sent in sentences]
+        return sum(support) / len(support)
+
+    def cited(self, answer: str, sources: list, limit: int) -> list:
+        answer_tokens = set(tokenize(answer))
+        ranked = sorted(sources, key=lambda s: len(answer_tokens & set(tokenize(s["content"]))), reverse=True)
+        return ranked[:limit]
+
+
+class LLMJudgeValidator:
+    def __init__(self, llm):
+        self.llm = llm
+
+    async def avalidate(self, answer: str, context: str) -> bool:
+        v_prompt = f"Context: {context}\nResponse: {answer}\nReply 'VALID' or 'INVALID' only."
+        v_res = await self.llm.ainvoke([HumanMessage(content=v_prompt)])
+        METRICS.record_llm("validate", v_res)
+        verdict = v_res.content.strip().upper()
+        return "VALID" in verdict and "INVALID" not in verdict
+
+
+class TieredValidator:
+    def __init__(self, llm, mode: str = "tiered", low: float = 0.35, high: float = 0.75, max_context_chunks: int = 4):
+        self.local = LexicalGroundingValidator()
+        self.judge = LLMJudgeValidator(llm) if llm else None
+        self.mode = mode
+        self.low = low
+        self.high = high
+        self.max_context_chunks = max_context_chunks
+
+    async def avalidate(self, answer: str, sources: list, context: str = "") -> bool:
+        if self.mode == "llm" and self.judge:
+            is_valid = await self.judge.avalidate(answer, context)
+            METRICS.record_validation("llm", is_valid)
+            return is_valid
+
+        score = self.local.score(answer, sources)
+        if score >= self.high or score <= self.low:
+            is_valid = score >= self.high
+            METRICS.record_validation("local", is_valid)
+            return is_valid
+        if self.mode == "local" or not self.judge:
+            # Ambiguous and no judge to escalate to: keep the answer, as the original validator did on failure.
+            METRICS.record_validation("local", True)
+            return True
+
+        cited = self.local.cited(answer, sources, self.max_context_chunks)
+        is_valid = await self.judge.avalidate(answer, format_chunks(cited) or context)
+        METRICS.record_validation("llm", is_valid)
+        return is_valid
+
+
+def build_validator(llm):
+    return TieredValidator(
+        llm,
+        mode=Config.VALIDATOR_MODE,
+        low=Config.VALIDATOR_LOW_SCORE,
+        high=Config.VALIDATOR_HIGH_SCORE,
+        max_context_chunks=Config.VALIDATOR_MAX_CONTEXT_CHUNKS
+    )
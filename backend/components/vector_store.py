@@ -1,53 +1,161 @@
-import chromadb
-from chromadb.config import Settings
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+import time
+from abc import ABC, abstractmethod
 from .config import Config
+from .embedding_cache import CachedEmbeddings
 
-class VectorStoreManager:
-    def __init__(self):
-        self._embedding_function = OpenAIEmbeddings(
-            model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
+def connect_with_retry(connect, attempts: int, backoff: float, max_backoff: float = 10.0):
+    delay = backoff
+    for attempt in range(1, attempts + 1):
         try:
-            print(f"Connecting to ChromaDB v1 at {Config.CHROMA_HOST}:{Config.CHROMA_PORT}...")
-            
-            settings = Settings(
-                chroma_client_auth_provider=None,
-                anonymized_telemetry=False
-            )
-            
-            self._client = chromadb.HttpClient(
-                host=Config.CHROMA_HOST, 
-                port=Config.CHROMA_PORT,
-                settings=settings
+            return connect()
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            print(f"ChromaDB connection attempt {attempt}/{attempts} failed: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            delay = min(delay * 2, max_backoff)
+
+class ChromaBackend(ABC):
+    """Chroma collection behind the langchain ``Chroma`` wrapper."""
+
+    def __init__(self, embedding_function, collection_name: str):
+        self.embedding_function = embedding_function
+        self.collection_name = collection_name
+        self._client = None
+
+    @abstractmethod
+    def _make_client(self):
+        """A chromadb client for this deployment."""
+
+    def _connect(self):
+        client = self._make_client()
+        client.heartbeat()
+        try:
+            client.get_collection(self.collection_name)
+        except Exception:
+            client.create_collection(self.collection_name)
+        return client
+
+    def open(self):
+        from langchain_chroma import Chroma
+
+        self._client = connect_with_retry(self._connect, Config.CHROMA_CONNECT_RETRIES, Config.CHROMA_CONNECT_BACKOFF)
+        return Chroma(
+            client=self._client,
+            embedding_function=self.embedding_function,
+            collection_name=self.collection_name
+        )
+
+    def reset(self, store):
+        # Recreates the collection in place so holders of ``store`` stay valid.
+        store.reset_collection()
+
+class ChromaHttpBackend(ChromaBackend):
+    def _make_client(self):
+        import chromadb
+        from chromadb.config import Settings
+
+        print(f"Connecting to ChromaDB v1 at {Config.CHROMA_HOST}:{Config.CHROMA_PORT}...")
+
+        settings = Settings(
+            chroma_client_auth_provider=None,
+            anonymized_telemetry=False
+        )
+
+        return chromadb.HttpClient(
+            host=Config.CHROMA_HOST,
+            port=Config.CHROMA_PORT,
+            settings=settings
+        )
+
+class ChromaPersistentBackend(ChromaBackend):
+    def __init__(self, embedding_function, collection_name: str, path: str = None):
+        super().__init__(embedding_function, collection_name)
+        self.path = path or Config.CHROMA_PERSIST_PATH
+
+    def _make_client(self):
+        import chromadb
+        from chromadb.config import Settings
+
+        print(f"Opening embedded ChromaDB at {self.path}...")
+        return chromadb.PersistentClient(path=self.path, settings=Settings(anonymized_telemetry=False))
+
+class NumpyBackend:
+    """In-process NumPy index; no server, persisted under ``NUMPY_INDEX_PATH``."""
+
+    def __init__(self, embedding_function, collection_name: str, path: str = None, index: str = None):
+        self.embedding_function = embedding_function
+        self.path = path if path is not None else Config.NUMPY_INDEX_PATH
+        if self.path and collection_name:
+            self.path = f"{self.path}/{collection_name}"
+        self.index = index or Config.NUMPY_INDEX_TYPE
+
+    def open(self):
+        from .numpy_index import NumpyVectorStore
+
+        return NumpyVectorStore(
+            self.embedding_function,
+            path=self.path,
+            index=self.index,
+            nlist=Config.NUMPY_IVF_NLIST,
+            nprobe=Config.NUMPY_IVF_NPROBE
+        )
+
+    def reset(self, store):
+        store.clear()
+
+BACKENDS = {
+    "chroma_http": ChromaHttpBackend,
+    "chroma_persistent": ChromaPersistentBackend,
+    "numpy": NumpyBackend,
+}
+
+class VectorStoreManager:
+    def __init__(self, backend: str = None, embedding_function=None, **backend_options):
+        backend = backend or Config.VECTOR_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown vector backend '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+
+        self._change_listeners = []
+        if embedding_function is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            embedding_function = OpenAIEmbeddings(
+                model=Config.EMBEDDING_MODEL,
+                openai_api_key=Config.OPENAI_API_KEY
             )
-            
-            self._client.heartbeat()
-
-            try:
-                self._client.get_collection(Config.COLLECTION_NAME)
-            except Exception:
-                self._client.create_collection(Config.COLLECTION_NAME)
-            
-            self._vector_store = Chroma(
-                client=self._client,
-                embedding_function=self._embedding_function,
-                collection_name=Config.COLLECTION_NAME
+        self._embedding_function = embedding_function
+        self.embedding_cache = None
+        if Config.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = CachedEmbeddings(
+                self._embedding_function,
+                store_path=Config.EMBEDDING_CACHE_PATH,
+                namespace=Config.EMBEDDING_MODEL,
+                max_memory_entries=Config.EMBEDDING_CACHE_SIZE,
+                batch_size=Config.EMBEDDING_BATCH_SIZE
             )
+            self._embedding_function = self.embedding_cache
+        self.backend_name = backend
+        self._backend = BACKENDS[backend](self._embedding_function, Config.COLLECTION_NAME, **backend_options)
+        try:
+            self._vector_store = self._backend.open()
         except Exception as e:
-            print(f"Failed to connect to ChromaDB: {e}")
+            print(f"Failed to open {backend} vector store: {e}")
             raise e
 
     @property
     def vector_store(self):
         return self._vector_store
 
+    def add_change_listener(self, callback):
+        self._change_listeners.append(callback)
+
+    def persist(self):
+        persist = getattr(self._vector_store, "persist", None)
+        if persist:
+            persist()
+
     def delete_collection(self):
-        self._client.delete_collection(Config.COLLECTION_NAME)
-        self._vector_store = Chroma(
-            client=self._client,
-            embedding_function=self._embedding_function,
-            collection_name=Config.COLLECTION_NAME
-        )
+        self._backend.reset(self._vector_store)
+        for callback in self._change_listeners:
+            callback()
@@ -1,19 +1,80 @@
+import asyncio
+import json
 import os
-import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import uvicorn
 from dotenv import load_dotenv
 from components.config import Config
 
-from rag_engine import RAGService
+from components.extractors import UnsupportedFormatError, get_extractor
+from components.ingestion import QueueFullError
+from components.metrics import METRICS
+from components.filters import build_where
 
 load_dotenv()
 
-app = FastAPI(title="RAG Chat Backend")
+class ServiceState:
+    def __init__(self):
+        self.service = None
+        self.error = None
+        self.attempts = 0
+        self.task = None
+        self.checkpointer = None
+
+    @property
+    def ready(self) -> bool:
+        return self.service is not None
+
+state = ServiceState()
+
+async def initialize_service():
+    # rag_engine pulls in langchain, chromadb and the model clients; keep that
+    # (and the ChromaDB connection) off the import path so the server binds at once.
+    delay = 1.0
+    while state.service is None:
+        state.attempts += 1
+        try:
+            from rag_engine import RAGService
+            from components.conversations import open_checkpointer
+            if state.checkpointer is None:
+                # Opened here, on the server's loop: the sqlite saver binds to the loop that creates it.
+                state.checkpointer = await open_checkpointer(Config.CONVERSATION_STORE, Config.CONVERSATION_DB_PATH)
+            state.service = await asyncio.to_thread(RAGService, checkpointer=state.checkpointer)
+            state.error = None
+            print(f"RAG service ready after {state.attempts} attempt(s)")
+        except Exception as e:
+            state.error = str(e)
+            print(f"RAG service initialization failed (attempt {state.attempts}): {e}. Retrying in {delay:.0f}s...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, Config.SERVICE_INIT_MAX_BACKOFF)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state.task = asyncio.create_task(initialize_service())
+    yield
+    if not state.task.done():
+        state.task.cancel()
+    if state.service:
+        await state.service.shutdown()
+    if state.checkpointer is not None:
+        from components.conversations import close_checkpointer
+        await close_checkpointer(state.checkpointer)
+
+def get_service():
+    if state.service is None:
+        detail = f"Service is starting: {state.error}" if state.error else "Service is starting"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "2"})
+    return state.service
+
+app = FastAPI(title="RAG Chat Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,60 +84,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-rag_service = RAGService()
-
 class ChatRequest(BaseModel):
     username: str = "User"
     query: str
     history: Optional[List[dict]] = []
     conversation_id: Optional[str] = None
     stream: bool = False
+    include_timings: bool = False
+    sources: Optional[List[str]] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+
+class BatchChatRequest(BaseModel):
+    username: str = "User"
+    queries: List[str]
+    concurrency: Optional[int] = None
+    sources: Optional[List[str]] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+
+async def save_upload(file: UploadFile, path: str):
+    with open(path, "wb") as buffer:
+        while chunk := await file.read(Config.UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(buffer.write, chunk)
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "RAG Backend is active"}
 
-@app.post("/upload")
+@app.get("/ready")
+def readiness():
+    if not state.ready:
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "starting", "attempts": state.attempts, "error": state.error},
+            headers={"Retry-After": "2"}
+        )
+    return {"status": "ready"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return get_service().cache_stats()
+
+@app.post("/upload", status_code=202)
 async def upload_file(file: UploadFile = File(...)):
+    rag_service = get_service()
+    try:
+        get_extractor(file.filename or "")
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    temp_path = None
     try:
         temp_dir = "temp_uploads"
         os.makedirs(temp_dir, exist_ok=True)
-        temp_path = os.path.join(temp_dir, file.filename)
+        temp_path = os.path.join(temp_dir, f"{uuid.uuid4()}_{os.path.basename(file.filename)}")
         
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        try:
-            result_message = rag_service.ingest_file(temp_path, file.filename)
-            status = "success"
-        except Exception as ingest_error:
-            result_message = f"Ingestion failed: {str(ingest_error)}"
-            status = "error"
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-        if status == "error":
-             raise HTTPException(status_code=500, detail=result_message)
-             
-        return {"status": "success", "message": result_message}
+        await save_upload(file, temp_path)
+        job = rag_service.submit_ingestion(temp_path, file.filename)
+        return {
+            "status": "queued",
+            "job_id": job["job_id"],
+            "message": f"{file.filename} queued for ingestion (job {job['job_id']})."
+        }
         
+    except QueueFullError as e:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/documents")
+def list_documents():
+    return get_service().list_documents()
+
+@app.get("/jobs")
+def list_jobs():
+    return get_service().list_ingestion_jobs()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_service().get_ingestion_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
+    rag_service = get_service()
+    where = build_where(request.sources, request.page_from, request.page_to)
     try:
         if request.stream:
             return StreamingResponse(
-                rag_service.query_stream(request.query, request.history, request.conversation_id, request.username), 
+                rag_service.aquery_stream(
+                    request.query, request.history, request.conversation_id, request.username,
+                    include_timings=request.include_timings, where=where
+                ), 
                 media_type="text/event-stream"
             )
         else:
-            result = rag_service.query(request.query, request.history, request.conversation_id, request.username)
+            result = await rag_service.aquery(
+                request.query, request.history, request.conversation_id, request.username, where=where
+            )
             return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/batch")
+async def chat_batch_endpoint(request: BatchChatRequest):
+    rag_service = get_service()
+    if len(request.queries) > Config.BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {Config.BATCH_MAX_QUERIES} queries per batch.")
+    where = build_where(request.sources, request.page_from, request.page_to)
+
+    async def results():
+        start = time.perf_counter()
+        count = 0
+        async for result in rag_service.aquery_batch(request.queries, request.username, where, request.concurrency):
+            count += 1
+            yield json.dumps({"type": "result", **result}) + "\n"
+        yield json.dumps({"type": "summary", "count": count, "wall_ms": round((time.perf_counter() - start) * 1000, 2)}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -3,34 +3,150 @@ from components.config import Config
 from components.llm import LLMFactory
 from components.vector_store import VectorStoreManager
 from components.document_processor import DocumentProcessor
-from components.rag_graph import RAGGraph
+from components.rag_graph import RAGGraph, shared_retrieval
+from components.answer_cache import SemanticAnswerCache
+from components.conversations import client_turns
+from components.ingestion import IngestionQueue
+from components.manifest import SourceManifest
+from components.lexical_index import BM25Index
+from components.metrics import METRICS
+from components.streaming import FinalAnswerDetector
+import contextvars
+import asyncio
 import json
+import time
 import uuid
+from langchain_core.documents import Document
 from langchain_core.messages import AIMessage
 
 class RAGService:
-    def __init__(self):
-        self.vector_store_manager = VectorStoreManager()
-        self.llm = LLMFactory.get_llm()
-        self.doc_processor = DocumentProcessor(self.vector_store_manager.vector_store)
+    def __init__(self, vector_store_manager=None, llm=None, checkpointer=None):
+        self.vector_store_manager = vector_store_manager or VectorStoreManager()
+        self.llm = llm or LLMFactory.get_llm()
+        self.answer_cache = None
+        if Config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticAnswerCache(
+                threshold=Config.ANSWER_CACHE_THRESHOLD,
+                ttl=Config.ANSWER_CACHE_TTL,
+                max_entries=Config.ANSWER_CACHE_SIZE
+            )
+            self.vector_store_manager.add_change_listener(self.answer_cache.invalidate)
+        self.manifest = SourceManifest(Config.MANIFEST_PATH)
+        self.vector_store_manager.add_change_listener(self.manifest.clear)
+        self.lexical_index = None
+        if Config.LEXICAL_INDEX_ENABLED:
+            self.lexical_index = BM25Index.load(Config.LEXICAL_INDEX_PATH)
+            if not len(self.lexical_index):
+                self._rebuild_lexical_index()
+            self.vector_store_manager.add_change_listener(self.lexical_index.clear)
+        self.doc_processor = DocumentProcessor(
+            self.vector_store_manager.vector_store,
+            on_change=self.answer_cache.invalidate if self.answer_cache else None,
+            batch_size=Config.INGEST_BATCH_SIZE,
+            manifest=self.manifest,
+            lexical_index=self.lexical_index
+        )
+        self.ingestion_queue = IngestionQueue(
+            self.doc_processor,
+            max_pending=Config.INGEST_QUEUE_SIZE,
+            workers=Config.INGEST_WORKERS,
+            process_workers=Config.INGEST_PROCESS_WORKERS,
+            job_history=Config.INGEST_JOB_HISTORY,
+            page_batch=Config.INGEST_PAGE_BATCH
+        )
         
         if self.llm:
-            self.rag_graph = RAGGraph(self.llm, self.vector_store_manager.vector_store)
+            self.rag_graph = RAGGraph(
+                self.llm, self.vector_store_manager.vector_store, lexical_index=self.lexical_index, catalog=self.manifest,
+                checkpointer=checkpointer
+            )
         else:
             self.rag_graph = None
     
+    def _rebuild_lexical_index(self):
+        # One-off build for collections populated before the lexical index existed.
+        try:
+            data = self.vector_store_manager.vector_store.get(include=["documents", "metadatas"])
+        except Exception:
+            return
+        docs = [
+            Document(page_content=text or "", metadata=meta or {})
+            for text, meta in zip(data["documents"], data["metadatas"])
+        ]
+        if docs:
+            self.lexical_index.add(data["ids"], docs)
+            self.lexical_index.save()
+    
     def ingest_file(self, file_path: str, original_filename: str) -> str:
-        return self.doc_processor.process_pdf(file_path, original_filename)
+        with METRICS.request("ingest_file") as trace:
+            message = self.doc_processor.process_file(file_path, original_filename)
+            if message.startswith("Error"):
+                trace.outcome = "error"
+            return message
+
+    def submit_ingestion(self, file_path: str, original_filename: str) -> dict:
+        return self.ingestion_queue.submit(file_path, original_filename).to_dict()
+
+    def get_ingestion_job(self, job_id: str) -> Optional[dict]:
+        job = self.ingestion_queue.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_ingestion_jobs(self) -> List[dict]:
+        return [job.to_dict() for job in self.ingestion_queue.jobs.values()]
+
+    def list_documents(self) -> List[dict]:
+        return self.manifest.documents()
+
+    async def shutdown(self):
+        await self.ingestion_queue.shutdown()
+        self.vector_store_manager.persist()
+
+    def cache_stats(self) -> dict:
+        embedding_cache = getattr(self.vector_store_manager, "embedding_cache", None)
+        return {
+            "answers": self.answer_cache.stats() if self.answer_cache else {"enabled": False},
+            "embeddings": embedding_cache.stats() if embedding_cache else {"enabled": False}
+        }
 
-    def query(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User") -> dict:
+    async def _cache_key(self, user_query: str, chat_history: List[dict], conversation_id: str, where: Optional[dict] = None):
+        # Answers that depend on prior turns or a document scope are not reusable across requests.
+        if not self.answer_cache or client_turns(chat_history) or where:
+            return None
+        try:
+            if await self.rag_graph.ahas_history(conversation_id):
+                return None
+            embedding = await self.vector_store_manager.vector_store.embeddings.aembed_query(user_query)
+        except Exception:
+            return None
+        return embedding, self.answer_cache.generation
+
+    async def aquery(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User",
+                     where: Optional[dict] = None) -> dict:
+        with METRICS.request("query") as trace:
+            return await self._aquery(user_query, chat_history, conversation_id, username, trace, where)
+
+    async def _aquery(self, user_query: str, chat_history: List[dict], conversation_id: str, username: str, trace,
+                      where: Optional[dict] = None) -> dict:
         if not self.llm or not self.rag_graph:
             return {"response": "System Error: LLM not initialized.", "sources": [], "conversation_id": conversation_id}
 
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
 
+        cache_key = await self._cache_key(user_query, chat_history, conversation_id, where)
+        if cache_key:
+            cached = self.answer_cache.lookup(cache_key[0])
+            if cached:
+                trace.outcome = "cache_hit"
+                await self.rag_graph.aremember(conversation_id, user_query, cached["response"])
+                return {**cached, "conversation_id": conversation_id}
+
         try:
-            final_state = self.rag_graph.run(user_query, chat_history, username=username, thread_id=conversation_id)
+            final_state = await self.rag_graph.arun(
+                user_query, chat_history, username=username, thread_id=conversation_id, where=where
+            )
+            trace.steps = final_state.get("steps", 0)
+            trace.retries = final_state.get("retry_count", 0)
             
             response_text = final_state.get("response", "")
             if not response_text and final_state.get("messages"):
@@ -46,15 +162,29 @@ class RAGService:
             if not final_state.get("is_valid", True) and final_state.get("retry_count", 0) >= Config.ITERATION_COUNT:
                 response_text = "There is no relevant information in the given data."
 
-            return {
+            result = {
                 "response": response_text,
                 "sources": final_state.get("sources", []),
                 "conversation_id": conversation_id
             }
+            if cache_key and final_state.get("is_valid") and response_text:
+                self.answer_cache.store(cache_key[0], result, generation=cache_key[1])
+            return result
         except Exception as e:
+            trace.outcome = "error"
             return {"response": f"Error: {str(e)}", "sources": [], "conversation_id": conversation_id}
 
-    def query_stream(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User"):
+    async def aquery_stream(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User",
+                            include_timings: bool = False, where: Optional[dict] = None):
+        with METRICS.request("query_stream") as trace:
+            async for event in self._aquery_stream(user_query, chat_history, conversation_id, username, trace, include_timings, where):
+                yield event
+
+    async def _aquery_stream(self, user_query: str, chat_history: List[dict], conversation_id: str, username: str, trace,
+                             include_timings: bool, where: Optional[dict] = None):
+        def timings():
+            return {"timings": trace.summary()} if include_timings else {}
+
         if not self.llm or not self.rag_graph:
             yield json.dumps({"type": "error", "content": "System Error: LLM not initialized."}) + "\n"
             return
@@ -62,22 +192,53 @@ class RAGService:
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
 
+        cache_key = await self._cache_key(user_query, chat_history, conversation_id, where)
+        if cache_key:
+            cached = self.answer_cache.lookup(cache_key[0])
+            if cached:
+                trace.outcome = "cache_hit"
+                await self.rag_graph.aremember(conversation_id, user_query, cached["response"])
+                yield json.dumps({"type": "final", **cached, "conversation_id": conversation_id, **timings()}) + "\n"
+                return
+
         try:
-            stream = self.rag_graph.run_stream(user_query, chat_history, username=username, thread_id=conversation_id)
+            stream = self.rag_graph.arun_stream(
+                user_query, chat_history, username=username, thread_id=conversation_id, where=where
+            )
             
             final_response = ""
             final_sources = []
             is_valid = False
             retry_count = 0
             last_ai_message = ""
+            detectors = {}
+            streamed_answer = False
             
-            for event in stream:
-                for node, values in event.items():
+            async for mode, payload in stream:
+                if mode == "messages":
+                    chunk, metadata = payload
+                    if metadata.get("langgraph_node") != "agent" or not isinstance(chunk.content, str):
+                        continue
+                    detector = detectors.setdefault(chunk.id, FinalAnswerDetector())
+                    token = detector.feed(chunk.content)
+                    if token:
+                        streamed_answer = True
+                        yield json.dumps({"type": "token", "content": token}) + "\n"
+                    continue
+
+                for node, values in payload.items():
+                    if not values:
+                        continue
                     if "messages" in values:
                         for m in values["messages"]:
                             if isinstance(m, AIMessage) and m.content:
                                 last_ai_message = m.content
                                 yield json.dumps({"type": "thinking", "content": m.content}) + "\n"
+
+                    if node == "validate" and not values.get("is_valid") and streamed_answer:
+                        # The streamed draft was rejected; clients should discard it.
+                        streamed_answer = False
+                        yield json.dumps({"type": "retract"}) + "\n"
                     
                     if "response" in values:
                          final_response = values["response"]
@@ -90,6 +251,10 @@ class RAGService:
                     
                     if "retry_count" in values: 
                          retry_count = values["retry_count"]
+                         trace.retries = retry_count
+
+                    if "steps" in values:
+                         trace.steps = values["steps"]
             
             if not final_response and last_ai_message:
                 if "FINAL_ANSWER:" in last_ai_message.upper():
@@ -102,19 +267,103 @@ class RAGService:
             
             if not final_response:
                 final_response = "I couldn't generate a response. Please try again or check the documentation."
+            elif cache_key and is_valid:
+                self.answer_cache.store(
+                    cache_key[0],
+                    {"response": final_response, "sources": final_sources},
+                    generation=cache_key[1]
+                )
 
             yield json.dumps({
                 "type": "final",
                 "response": final_response,
                 "sources": final_sources,
-                "conversation_id": conversation_id
+                "conversation_id": conversation_id,
+                **timings()
             }) + "\n"
 
         except Exception as e:
+            trace.outcome = "error"
             yield json.dumps({"type": "error", "content": str(e)}) + "\n"
             yield json.dumps({
                 "type": "final",
                 "response": f"Sorry, an error occurred: {str(e)}",
                 "sources": [],
-                "conversation_id": conversation_id
+                "conversation_id": conversation_id,
+                **timings()
             }) + "\n"
+
+    async def _prefetch_query_embeddings(self, queries: List[str]):
+        # One batched embedding call for the whole batch; each run then hits the cache.
+        embed_queries = getattr(self.vector_store_manager.vector_store.embeddings, "embed_queries", None)
+        if not embed_queries or not queries:
+            return
+        try:
+            await asyncio.to_thread(embed_queries, list(dict.fromkeys(queries)))
+        except Exception as e:
+            print(f"Batch query embedding failed, embedding per query instead: {e}")
+
+    async def aquery_batch(self, queries: List[str], username: str = "User", where: Optional[dict] = None,
+                           concurrency: int = None):
+        """Answer independent questions concurrently, yielding each result as it completes.
+
+        Results carry ``index``, the question's position in ``queries``. Every
+        question runs in its own conversation, deleted once it is answered as
+        there are no follow-up turns; identical document searches made by
+        different questions run once.
+        """
+        if not queries:
+            return
+        await self._prefetch_query_embeddings(queries)
+        limit = min(concurrency or Config.BATCH_MAX_CONCURRENCY, Config.BATCH_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        async def answer(index: int, query: str) -> dict:
+            async with semaphore:
+                start = time.perf_counter()
+                conversation_id = f"batch-{uuid.uuid4()}"
+                try:
+                    result = await self.aquery(query, [], conversation_id, username, where)
+                finally:
+                    try:
+                        await self.rag_graph.aforget(conversation_id)
+                    except Exception as e:
+                        print(f"Failed to delete batch conversation {conversation_id}: {e}")
+                result.pop("conversation_id", None)
+                return {"index": index, "query": query, **result,
+                        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+        with shared_retrieval():
+            tasks = [asyncio.ensure_future(answer(i, q)) for i, q in enumerate(queries)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def query(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User",
+              where: Optional[dict] = None) -> dict:
+        return asyncio.run(self.aquery(user_query, chat_history, conversation_id, username, where))
+
+    def query_batch(self, queries: List[str], username: str = "User", where: Optional[dict] = None,
+                    concurrency: int = None) -> List[dict]:
+        async def collect():
+            return [result async for result in self.aquery_batch(queries, username, where, concurrency)]
+        return sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+    def query_stream(self, user_query: str, chat_history: List[dict] = [], conversation_id: str = None, username: str = "User",
+                     include_timings: bool = False, where: Optional[dict] = None):
+        loop = asyncio.new_event_loop()
+        # Every step runs in the same context so the request trace survives across yields.
+        context = contextvars.copy_context()
+        stream = self.aquery_stream(user_query, chat_history, conversation_id, username, include_timings, where)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(loop.create_task(stream.__anext__(), context=context))
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(loop.create_task(stream.aclose(), context=context))
+            loop.close()
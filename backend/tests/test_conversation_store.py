@@ -0,0 +1,107 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite.aio")
+
+from components.config import Config
+from components.conversations import close_checkpointer, open_checkpointer
+from rag_engine import RAGService
+from benchmarks.fakes import FakeReActLLM, FakeVectorStoreManager, make_corpus
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(monkeypatch):
+    monkeypatch.setattr(Config, "ANSWER_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "MANIFEST_PATH", None)
+    monkeypatch.setattr(Config, "LEXICAL_INDEX_PATH", None)
+
+
+async def start_service(db_path: str):
+    # As main.initialize_service does: open the store on the loop, build the service in a thread.
+    checkpointer = await open_checkpointer("sqlite", db_path)
+    manager = FakeVectorStoreManager()
+    docs = make_corpus()
+    manager.vector_store.add_documents(docs, ids=[d.metadata["chunk_id"] for d in docs])
+    service = await asyncio.to_thread(
+        RAGService, vector_store_manager=manager, llm=FakeReActLLM(latency=0), checkpointer=checkpointer
+    )
+    return service, checkpointer
+
+
+async def stop_service(service, checkpointer):
+    await service.shutdown()
+    await close_checkpointer(checkpointer)
+
+
+async def history(service, conversation_id: str) -> list:
+    snapshot = await service.rag_graph.graph.aget_state(service.rag_graph._thread_config(conversation_id))
+    return [m.content for m in (snapshot.values or {}).get("history", [])]
+
+
+def test_sqlite_conversation_survives_restart(tmp_path):
+    db_path = os.path.join(tmp_path, "missing", "dir", "conversations.sqlite")
+
+    async def scenario():
+        service, checkpointer = await start_service(db_path)
+        first = await asyncio.wait_for(
+            service.aquery("What does error code E00001 mean?", conversation_id="c1"), timeout=30
+        )
+        assert not first["response"].startswith("Error")
+        await stop_service(service, checkpointer)
+        assert os.path.exists(db_path)
+
+        service, checkpointer = await start_service(db_path)
+        try:
+            assert await service.rag_graph.ahas_history("c1")
+            await asyncio.wait_for(
+                service.aquery("And error code E01002?", conversation_id="c1"), timeout=30
+            )
+            turns = await history(service, "c1")
+        finally:
+            await stop_service(service, checkpointer)
+        assert turns[0] == "What does error code E00001 mean?"
+        assert turns[2] == "And error code E01002?"
+        assert len(turns) == 4
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_idle_conversation_evicted_after_restart(tmp_path):
+    db_path = os.path.join(tmp_path, "conversations.sqlite")
+
+    async def scenario():
+        service, checkpointer = await start_service(db_path)
+        await asyncio.wait_for(service.aquery("What does error code E00001 mean?", conversation_id="old"), timeout=30)
+        await stop_service(service, checkpointer)
+
+        # The new process never sees "old" again; only the stored activity time can expire it.
+        service, checkpointer = await start_service(db_path)
+        try:
+            store = service.rag_graph.conversations
+            store.ttl = 0
+            assert await store.evict_idle(force=True) == ["old"]
+            assert not await service.rag_graph.ahas_history("old")
+        finally:
+            await stop_service(service, checkpointer)
+
+    asyncio.run(scenario())
+
+
+def test_batch_questions_leave_no_conversations(tmp_path):
+    db_path = os.path.join(tmp_path, "conversations.sqlite")
+
+    async def scenario():
+        service, checkpointer = await start_service(db_path)
+        try:
+            queries = [f"What does error code E0000{i} mean?" for i in range(4)]
+            results = [r async for r in service.aquery_batch(queries)]
+            async with checkpointer.conn.execute("SELECT COUNT(*) FROM checkpoints") as cursor:
+                stored = (await cursor.fetchone())[0]
+        finally:
+            await stop_service(service, checkpointer)
+        assert len(results) == 4
+        assert stored == 0
+
+    asyncio.run(scenario())
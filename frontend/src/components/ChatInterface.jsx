@@ -4,6 +4,18 @@ import { FaPaperclip, FaArrowUp, FaTrash } from 'react-icons/fa';
 import './ChatInterface.css';
 
 const API_BASE = "http://localhost:8000";
+const JOB_POLL_MS = 1000;
+const JOB_POLL_MAX_ERRORS = 5;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const describeJob = (job) => {
+    if (job.status === 'completed') return `✅ ${job.message}`;
+    if (job.status === 'failed') return `❌ ${job.message}`;
+    if (job.status === 'queued') return `⏳ ${job.filename} queued for ingestion...`;
+    const pages = job.total_pages ? ` (page ${job.processed_pages}/${job.total_pages})` : "";
+    return `⏳ ${job.status === 'parsing' ? 'Reading' : 'Indexing'} ${job.filename}${pages}...`;
+};
 
 const ChatInterface = () => {
     const [conversationId, setConversationId] = useState(() => localStorage.getItem('chat_conversation_id') || null);
@@ -24,6 +36,7 @@ const ChatInterface = () => {
     const [isLoading, setIsLoading] = useState(false);
     const [currentStatus, setCurrentStatus] = useState("");
     const [isThinking, setIsThinking] = useState(false);
+    const [draft, setDraft] = useState("");
     const fileInputRef = useRef(null);
     const messagesEndRef = useRef(null);
 
@@ -51,10 +64,13 @@ const ChatInterface = () => {
         setIsLoading(true);
         setIsThinking(true);
         setCurrentStatus("Starting...");
+        setDraft("");
 
         try {
-            const history = messages
-                .filter(m => m.role !== 'system' && m.content)
+            // Skip the greeting: history before the first question only defeats the answer cache.
+            const turns = messages.filter(m => m.role !== 'system' && m.content);
+            const firstQuestion = turns.findIndex(m => m.role === 'user');
+            const history = (firstQuestion === -1 ? [] : turns.slice(firstQuestion))
                 .map(m => ({ role: m.role, content: m.content }));
 
             const response = await fetch(`${API_BASE}/chat`, {
@@ -99,6 +115,12 @@ const ChatInterface = () => {
                             else if (data.content.includes("OBSERVATION")) setCurrentStatus("Found results...");
                             else setCurrentStatus("Analyzing...");
 
+                        } else if (data.type === 'token') {
+                            setDraft(prev => prev + data.content);
+                            setCurrentStatus("Answering...");
+                        } else if (data.type === 'retract') {
+                            setDraft("");
+                            setCurrentStatus("Re-checking answer...");
                         } else if (data.type === 'final') {
                             finalRes = data.response;
                             finalSrc = data.sources || [];
@@ -122,6 +144,7 @@ const ChatInterface = () => {
         } finally {
             setIsLoading(false);
             setIsThinking(false);
+            setDraft("");
         }
     };
 
@@ -144,15 +167,46 @@ const ChatInterface = () => {
 
         setMessages(prev => [...prev, { role: 'system', content: `Uploading ${file.name}...` }]);
 
+        e.target.value = null;
+        let jobId;
         try {
             const res = await axios.post(`${API_BASE}/upload`, formData, {
                 headers: { 'Content-Type': 'multipart/form-data' }
             });
-            setMessages(prev => [...prev, { role: 'system', content: `✅ ${res.data.message}` }]);
+            jobId = res.data.job_id;
         } catch (error) {
-            setMessages(prev => [...prev, { role: 'system', content: `❌ Error uploading ${file.name}` }]);
+            const detail = error.response?.data?.detail;
+            setMessages(prev => [...prev, { role: 'system', content: `❌ Error uploading ${file.name}${detail ? `: ${detail}` : ""}` }]);
+            return;
+        }
+        setMessages(prev => [...prev, { role: 'system', jobId, content: `⏳ ${file.name} queued for ingestion...` }]);
+        await pollJob(jobId, file.name);
+    };
+
+    const setJobMessage = (jobId, content) => {
+        setMessages(prev => prev.map(m => m.jobId === jobId ? { ...m, content } : m));
+    };
+
+    // The upload only queues the file; follow the job until it is indexed or fails.
+    const pollJob = async (jobId, filename) => {
+        let errors = 0;
+        while (true) {
+            await sleep(JOB_POLL_MS);
+            let job;
+            try {
+                job = (await axios.get(`${API_BASE}/jobs/${jobId}`)).data;
+                errors = 0;
+            } catch (error) {
+                errors += 1;
+                if (error.response?.status === 404 || errors >= JOB_POLL_MAX_ERRORS) {
+                    setJobMessage(jobId, `❌ Lost track of ${filename} while it was being ingested.`);
+                    return;
+                }
+                continue;
+            }
+            setJobMessage(jobId, describeJob(job));
+            if (job.status === 'completed' || job.status === 'failed') return;
         }
-        e.target.value = null;
     };
 
     return (
@@ -191,9 +245,13 @@ const ChatInterface = () => {
                 ))}
                 {isLoading && (
                     <div className="message-row assistant">
-                        <div className="message-bubble assistant typing">
-                            <span>.</span><span>.</span><span>.</span>
-                        </div>
+                        {draft ? (
+                            <div className="message-bubble assistant">{draft}</div>
+                        ) : (
+                            <div className="message-bubble assistant typing">
+                                <span>.</span><span>.</span><span>.</span>
+                            </div>
+                        )}
                     </div>
                 )}
                 <div ref={messagesEndRef} />